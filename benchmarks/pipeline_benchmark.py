@@ -0,0 +1,188 @@
+# 필터/집계/근로자수 대응 파이프라인 벤치마크 (네트워크 없이 실행)
+#
+# 전체_재해_현황_및_분석규모별_산업별_중분류.csv 의 연도·대업종·중업종·규모 어휘(근로자수 비중으로 가중)와
+# 발생형태 폴더의 발생형태 목록으로 마이크로데이터 원본 형식의 합성 데이터를 1x/10x/100x 규모로 만들고,
+# 데이터 로딩과 대표적인 multiselect 조합별 filter / group / metrics 단계를 측정해 JSON으로 저장
+#
+# 사용법 (저장소 최상위에서):
+#   python benchmarks/pipeline_benchmark.py --scales 1 10 100 --output benchmarks/results.json
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from pipeline import cache, loader, query, schema  # noqa: E402
+
+RATE_FILE = '전체_재해_현황_및_분석규모별_산업별_중분류.csv'
+# 1x 규모의 연도별 행 수
+BASE_ROWS = 100_000
+
+# 통계표의 규모 열 → 마이크로데이터 원본 규모 값 (10~29인은 원본에서 10~19인/20~29인으로 나뉨)
+SCALE_VALUES = {
+    '5인 미만': ['5인 미만'], '5~9인': ['5~9인'], '10~29인': ['10~19인', '20~29인'],
+    '30~49인': ['30~49인'], '50~99인': ['50~99인'], '100~299인': ['100~299인'],
+    '300~499인': ['300~499인'], '500~999인': ['500~999인'], '1000인 이상': ['1,000인 이상'],
+}
+
+# 대표적인 multiselect 조합 (dashboard.py 기본값, 전체 선택, 일부 선택)
+COMBINATIONS = {
+    'default_건설업': {'중업종': ['건설업']},
+    '건설업_x_발생형태전체': {'중업종': ['건설업'], '발생형태': 'ALL'},
+    '제조업_규모전체_2022': {'대업종': ['제조업'], '규모': 'ALL', '통계기준년': [2022]},
+    '중업종전체_x_발생형태전체': {'중업종': 'ALL', '발생형태': 'ALL'},
+    '전체선택': {'통계기준년': 'ALL', '규모': 'ALL', '대업종': 'ALL', '중업종': 'ALL', '발생형태': 'ALL'},
+}
+
+
+# 통계표에서 (연도, 대업종, 중업종, 규모별 근로자수) 어휘를 읽음 (원본 표기 그대로: 공백 포함)
+def read_vocabulary(data_folder):
+    rate = pd.read_csv(os.path.join(data_folder, RATE_FILE))
+    rate = rate[(rate['중업종'] != '소계') & (rate['항목'] == '근로자수 (명)')]
+    weights = rate.melt(id_vars=['통계기준년', '대업종', '중업종'], value_vars=list(SCALE_VALUES),
+                        var_name='규모', value_name='근로자수')
+    weights['근로자수'] = pd.to_numeric(weights['근로자수'], errors='coerce').fillna(0).clip(lower=0)
+    accident_types = sorted(name[:-4] for name in os.listdir(os.path.join(ROOT, '발생형태')) if name.endswith('.csv'))
+    return weights, accident_types
+
+
+# 한 연도의 합성 마이크로데이터 (근로자수 비중대로 업종·규모를 뽑음)
+def synthetic_year(weights, accident_types, year, n_rows, rng):
+    cells = weights[weights['통계기준년'] == year].reset_index(drop=True)
+    p = cells['근로자수'].to_numpy(dtype=float)
+    picks = cells.iloc[rng.choice(len(cells), size=n_rows, p=p / p.sum())]
+    scales = [rng.choice(SCALE_VALUES[scale]) for scale in picks['규모']]
+    return pd.DataFrame({
+        '통계기준년월': year * 100 + rng.integers(1, 13, n_rows),
+        '성별': rng.choice(['남', '여'], n_rows),
+        '규모': scales,
+        '대업종': picks['대업종'].to_numpy(),
+        # 원본 중업종은 공백 없이 표기됨
+        '중업종': picks['중업종'].str.replace(' ', '').to_numpy(),
+        '발생형태': rng.choice(accident_types, n_rows),
+        '재해정도': rng.choice(list(schema.severity_mapping), n_rows),
+        '연령': rng.integers(18, 75, n_rows),
+    })
+
+
+# 벤치마크용 데이터 폴더 생성 (연도별 CSV + 통계표/중업종리스트 복사)
+def write_dataset(folder, weights, accident_types, rows_per_year, seed):
+    rng = np.random.default_rng(seed)
+    for year in sorted(weights['통계기준년'].unique()):
+        df = synthetic_year(weights, accident_types, int(year), rows_per_year, rng)
+        df.to_csv(os.path.join(folder, f'{year}_산업재해통계_마이크로데이터_merged.csv'), index=False)
+    for name in [RATE_FILE, '중업종리스트.csv']:
+        shutil.copy(os.path.join(ROOT, 'Data', name), folder)
+
+
+def _timed(fn):
+    start = time.perf_counter()
+    value = fn()
+    return value, (time.perf_counter() - start) * 1000
+
+
+def _summary(times):
+    return {'median_ms': round(statistics.median(times), 3), 'min_ms': round(min(times), 3),
+            'max_ms': round(max(times), 3), 'repeat': len(times)}
+
+
+def _selections(dataset, combination):
+    selections = {}
+    for col in ['통계기준년', '규모', '대업종', '중업종', '발생형태']:
+        values = combination.get(col, [])
+        selections[col] = dataset.cube[col].dropna().unique().tolist() if values == 'ALL' else values
+    return selections
+
+
+# 조합마다 결과 캐시를 비운 상태에서 filter → group → metrics 측정
+def bench_queries(dataset, repeat):
+    results = {}
+    for name, combination in COMBINATIONS.items():
+        selections = _selections(dataset, combination)
+        selected_columns = [col for col, values in selections.items() if values]
+        times = {'filter': [], 'group': [], 'metrics': []}
+        for _ in range(repeat):
+            result_cache = cache.LRUCache(maxsize=8)
+            filtered_df, ms = _timed(lambda: query.filter_cells(dataset, selections, selected_columns, result_cache))
+            times['filter'].append(ms)
+            df_group, ms = _timed(lambda: query.group_cells(dataset, filtered_df, selections, selected_columns, result_cache))
+            times['group'].append(ms)
+            merged, ms = _timed(lambda: query.derive_metrics(dataset, df_group, selections, selected_columns, result_cache))
+            times['metrics'].append(ms)
+        results[name] = {stage: _summary(values) for stage, values in times.items()}
+        results[name]['result_rows'] = len(merged)
+    return results
+
+
+def bench_scale(scale, weights, accident_types, base_rows, repeat, seed):
+    rows_per_year = base_rows * scale
+    folder = tempfile.mkdtemp(prefix=f'dashboard_bench_{scale}x_')
+    try:
+        _, generate_ms = _timed(lambda: write_dataset(folder, weights, accident_types, rows_per_year, seed))
+        # cold: 스냅샷 없이 원본 파일부터 / warm: 스냅샷에서 읽기
+        dataset, cold_ms = _timed(lambda: loader.load_dataset(folder))
+        warm = [_timed(lambda: loader.load_dataset(folder))[1] for _ in range(repeat)]
+        return {
+            'scale': scale,
+            'rows_per_year': rows_per_year,
+            'years': list(dataset.years),
+            'cube_cells': len(dataset.cube),
+            'generate_ms': round(generate_ms, 3),
+            'load': {'cold_ms': round(cold_ms, 3), 'warm': _summary(warm)},
+            'queries': bench_queries(dataset, repeat),
+        }
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+
+
+def _git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description='대시보드 데이터 파이프라인 벤치마크')
+    parser.add_argument('--scales', type=int, nargs='+', default=[1, 10, 100])
+    parser.add_argument('--base-rows', type=int, default=BASE_ROWS, help='1x 규모의 연도별 행 수')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default=os.path.join(ROOT, 'benchmarks', 'results.json'))
+    args = parser.parse_args()
+
+    weights, accident_types = read_vocabulary(os.path.join(ROOT, 'Data'))
+    results = []
+    for scale in args.scales:
+        print(f'{scale}x: {args.base_rows * scale:,} rows/year ...', flush=True)
+        results.append(bench_scale(scale, weights, accident_types, args.base_rows, args.repeat, args.seed))
+
+    report = {
+        'commit': _git_commit(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'backend': query.BACKEND,
+        'ingest_mode': loader.INGEST_MODE,
+        'base_rows': args.base_rows,
+        'seed': args.seed,
+        'results': results,
+    }
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f'saved {args.output}')
+
+
+if __name__ == '__main__':
+    main()
@@ -3,77 +3,30 @@ import streamlit as st
 st.write("✅ 앱 시작됨")
 import plotly.express as px
 import os
+from pipeline import app, charts, cube, filters, query
+from pipeline.schema import scale_mapping
 
-# 데이터 집계 함수 (캐싱)
-@st.cache_data
-def load_data():
-    data_folder = 'Data'
-    df_2023 = pd.read_excel(os.path.join(data_folder, '2023_산업재해통계_마이크로데이터_merged.xlsx'))
-    df_2022 = pd.read_csv(os.path.join(data_folder, '2022_산업재해통계_마이크로데이터_merged.csv'))
-    df_2021 = pd.read_csv(os.path.join(data_folder, '2021_산업재해통계_마이크로데이터_merged.csv'))
-    중업종리스트_df = pd.read_csv(os.path.join(data_folder, '중업종리스트.csv'))
-    df = pd.concat([df_2023, df_2022, df_2021], axis=0, ignore_index=True)
-    df['중업종'] = df['중업종'].str.replace('전기·가스·증기및수도사업', '전기·가스·증기·수도사업')
-    df['대업종'] = df['대업종'].str.replace('전기·가스·증기및수도사업', '전기·가스·증기·수도사업')
-    df['중업종'] = df['중업종'].str.replace('출판·인쇄·제본또는인쇄물가공업', '출판·인쇄·제본업')
-    df['통계기준년'] = df['통계기준년월'].astype(str).str[:4].astype(int)
-    
-    severity_mapping = {
-        '사망자': 400,
-        '6개월 이상': 200.0,
-        '91~180일': 135.5,
-        '29~90일': 59.5,
-        '15~28일': 21.5,
-        '8~14일': 11,
-        '4~7일': 5.5
-    }
-    # 규모 매핑
-    scale_mapping = {
-        '5인 미만': 1,
-        '5~9인': 2,
-        '10~19인': 3,
-        '20~29인': 4,
-        '30~49인': 5,
-        '50~99인': 6,
-        '100~299인': 7,
-        '300~499인': 8,
-        '500~999인': 9,
-        '1,000인 이상': 10  # Assuming 1,000 as the minimum for this range
-    }
-    df['재해정도_숫자'] = df['재해정도'].map(severity_mapping)
-
-    return df, 중업종리스트_df
-
-# 데이터 로딩
-df, 중업종리스트_df = load_data()
+# 데이터 로딩 (모든 대시보드가 같은 스냅샷/캐시를 공유)
+dataset = app.load_data()
+df_cube = dataset.cube
+중업종리스트_df = dataset.중업종리스트_df
+result_cache = app.get_result_cache()
 
 # Streamlit 대시보드 설정
 st.title('재해정도 분석 대시보드')
 
 # 사용자 입력 (필터 선택)
-scale_mapping = {
-    '5인 미만': 1,
-    '5~9인': 2,
-    '10~19인': 3,
-    '20~29인': 4,
-    '30~49인': 5,
-    '50~99인': 6,
-    '100~299인': 7,
-    '300~499인': 8,
-    '500~999인': 9,
-    '1,000인 이상': 10  # Assuming 1,000 as the minimum for this range
-}
-규모_list = sorted(df['규모'].unique().tolist(), key=lambda x: scale_mapping.get(x, 0))  # 정렬 추가
-대업종_list = df['대업종'].unique().tolist()
-중업종_list = df['중업종'].unique().tolist()
-발생형태_list = df['발생형태'].unique().tolist()
-년도_list = df['통계기준년'].unique().tolist()
+규모_list = sorted(df_cube['규모'].unique().tolist(), key=lambda x: scale_mapping.get(x, 0))  # 정렬 추가
+대업종_list = df_cube['대업종'].unique().tolist()
+중업종_list = df_cube['중업종'].unique().tolist()
+발생형태_list = df_cube['발생형태'].unique().tolist()
+년도_list = df_cube['통계기준년'].unique().tolist()
 
 # 선택지 목록에 '없음' 포함
 selected_규모 = st.selectbox('규모 선택', ['없음', '전체'] + 규모_list)
 selected_대업종 = st.selectbox('대업종 선택', ['없음', '전체'] + 대업종_list)
 if selected_대업종 != '전체' and selected_대업종 != '없음':
-    filtered_middle_industries = df[df['대업종'] == selected_대업종]['중업종'].unique().tolist()
+    filtered_middle_industries = df_cube[df_cube['대업종'] == selected_대업종]['중업종'].unique().tolist()
 else:
     filtered_middle_industries = 중업종_list
 filtered_middle_industries = sorted(filtered_middle_industries) 
@@ -81,63 +34,30 @@ selected_중업종 = st.selectbox('중업종 선택', ['없음', '전체'] + fil
 selected_발생형태 = st.selectbox('발생형태 선택', ['없음', '전체'] + 발생형태_list)
 selected_년도 = st.selectbox('년도 선택', ['없음', '전체'] + 년도_list)
 
-# 필터 적용 함수
-@st.cache_data
-def filter_and_select_columns(df, selected_규모, selected_대업종, selected_중업종, selected_발생형태, selected_년도):
-    filtered_df = df.copy()
-    selected_columns = ['통계기준년', '규모', '대업종', '중업종', '발생형태']
-
-    # 필터링 적용 및 그룹화 기준 설정 (전체와 없음 구분)
-    if selected_규모 == '없음':
-        selected_columns.remove('규모')  # 그룹화에서 제외
-    elif selected_규모 != '전체': 
-        filtered_df = filtered_df[filtered_df['규모'] == selected_규모]
-        
-    if selected_대업종 == '없음':
-        selected_columns.remove('대업종')
-    elif selected_대업종 != '전체':
-        filtered_df = filtered_df[filtered_df['대업종'] == selected_대업종]
-        
-    if selected_중업종 == '없음':
-        selected_columns.remove('중업종')
-    elif selected_중업종 != '전체':
-        filtered_df = filtered_df[filtered_df['중업종'] == selected_중업종]
-        
-    if selected_발생형태 == '없음':
-        selected_columns.remove('발생형태')
-    elif selected_발생형태 != '전체':
-        filtered_df = filtered_df[filtered_df['발생형태'] == selected_발생형태]
-        
-    if selected_년도 == '없음':
-        selected_columns.remove('통계기준년')
-    elif selected_년도 != '전체':
-        filtered_df = filtered_df[filtered_df['통계기준년'] == selected_년도]
-
-    return filtered_df, selected_columns
-
-
-# 필터링 및 그룹화 기준 설정 (df: 원본 데이터 - 필터링 후 동적 그룹화용)
-filtered_df, selected_columns = filter_and_select_columns(
-    df, selected_규모, selected_대업종, selected_중업종, selected_발생형태, selected_년도
-)
+choices = {
+    '통계기준년': selected_년도,
+    '규모': selected_규모,
+    '대업종': selected_대업종,
+    '중업종': selected_중업종,
+    '발생형태': selected_발생형태,
+}
+# '없음'은 그룹화에서 제외, '전체'는 필터 없이 그룹화, 그 외 값은 필터 적용
+selections, selected_columns = filters.from_selectbox(choices)
 
-# 전체 위험지수 합계 계산
-total_risk = df['재해정도_숫자'].sum()
+# 필터링 (df_cube: 집계 큐브 - 필터링 후 동적 롤업용)
+filtered_df = query.filter_cells(dataset, selections, selected_columns, result_cache)
 
 # 그룹화 기준이 없는 경우 에러 방지
 if len(selected_columns) == 0:
     st.error("선택된 그룹화 기준이 없습니다. 적어도 하나의 기준을 선택하세요.")
+    df_group2 = pd.DataFrame(columns=['위험지수', '재해자수', '정규화된_위험지수'])
 else:
-    # 그룹화 처리 (사용자가 필터링한 데이터를 사용)
-    df_group2 = filtered_df.groupby(selected_columns).agg(
-        위험지수=('재해정도_숫자', 'sum'),
-        재해자수=('재해정도_숫자', 'count')
-    ).reset_index()
-
-    # 정규화된 위험지수 다시 계산
-    df_group2['정규화된_위험지수'] = (df_group2['위험지수'] / total_risk) * 10000
+    # 그룹화 및 정규화된 위험지수 계산 (사용자가 필터링한 데이터를 사용)
+    df_group2 = query.group_cells(dataset, filtered_df, selections, selected_columns, result_cache)
     df_group2 = df_group2.sort_values(by='정규화된_위험지수', ascending=False)
 
+app.show_cache_stats(result_cache)
+
 # 그래프 설정 옵션 제공
 st.subheader(f"그래프 설정")
 columns_for_x_and_color = ['없음', '규모', '대업종', '중업종', '발생형태', '통계기준년']
@@ -154,40 +74,42 @@ if st.button('그래프 그리기'):
     # 그래프를 그릴 때는 df_group2를 사용해야 함
     if x_axis == '규모':
         # 규모 열이 선택되었을 때는 scale_mapping 순서대로 정렬
-        df_group2['규모_숫자'] = df_group2['규모'].map(scale_mapping)
-        df_group2 = df_group2.sort_values(by='규모_숫자')
+        # 캐시된 결과를 바꾸지 않도록 새 열은 assign으로 추가
+        df_group2 = df_group2.assign(규모_숫자=df_group2['규모'].map(scale_mapping)).sort_values(by='규모_숫자')
     
+    # 선택 지표 상위 행만 그리고 나머지는 '기타' 막대로 합침
+    chart_df = charts.reduce_chart_data(df_group2, metric, x_axis, color_axis)
+
     # 그래프 그리기
     if graph_type == 'Bar':
         if color_axis == '없음':
-            fig = px.bar(df_group2, x=x_axis, y=metric, title=f'{metric} Bar 그래프')
+            fig = px.bar(chart_df, x=x_axis, y=metric, title=f'{metric} Bar 그래프')
         else:
-            fig = px.bar(df_group2, x=x_axis, y=metric, color=color_axis, title=f'{metric} Bar 그래프')
+            fig = px.bar(chart_df, x=x_axis, y=metric, color=color_axis, title=f'{metric} Bar 그래프')
             
     elif graph_type == 'Line':
         if color_axis == '없음':
-            fig = px.line(df_group2, x=x_axis, y=metric, title=f'{metric} Line 그래프')
+            fig = px.line(chart_df, x=x_axis, y=metric, title=f'{metric} Line 그래프')
         else:
-            fig = px.line(df_group2, x=x_axis, y=metric, color=color_axis, title=f'{metric} Line 그래프')
+            fig = px.line(chart_df, x=x_axis, y=metric, color=color_axis, title=f'{metric} Line 그래프')
             
     elif graph_type == 'Scatter':
         if color_axis == '없음':
-            fig = px.scatter(df_group2, x=x_axis, y=metric, title=f'{metric} Scatter 그래프')
+            fig = px.scatter(chart_df, x=x_axis, y=metric, title=f'{metric} Scatter 그래프')
         else:
-            fig = px.scatter(df_group2, x=x_axis, y=metric, color=color_axis, title=f'{metric} Scatter 그래프')
+            fig = px.scatter(chart_df, x=x_axis, y=metric, color=color_axis, title=f'{metric} Scatter 그래프')
         
-    st.plotly_chart(fig)
+    # x축이 통계기준년이어도 '기타' 막대가 빠지지 않도록 범주형 축으로 고정
+    st.plotly_chart(charts.category_xaxis(fig, chart_df, x_axis))
+    st.caption(charts.payload_caption(df_group2, chart_df, x_axis, metric))
 
 
 # 1중업종, 1발생형태 당 평균 정규화된_위험지수 계산
-df_group = df.groupby(['중업종']).agg(
-    위험지수=('재해정도_숫자', 'sum'),
-    재해자수=('재해정도_숫자', 'count')
-).reset_index()
+df_group = cube.rollup(df_cube, ['중업종'])
 total_risk = df_group['위험지수'].sum()
 df_group['정규화된_위험지수'] = (df_group['위험지수'] / total_risk) * 10000
-df_group['정규화된_위험지수/24'] = df_group['정규화된_위험지수']/df['발생형태'].nunique()
-risk_average = df_group['정규화된_위험지수/24'].sum()/df['중업종'].nunique()
+df_group['정규화된_위험지수/24'] = df_group['정규화된_위험지수']/df_cube['발생형태'].nunique()
+risk_average = df_group['정규화된_위험지수/24'].sum()/df_cube['중업종'].nunique()
 
 # 표
 st.subheader(f"표 (1 중업종, 1 발생형태 당 평균 정규화된_위험지수 = {risk_average:.2f})")
@@ -269,4 +191,6 @@ if selected_중업종 != '없음' and selected_중업종 != '전체':
         csv_df = load_csv_file(selected_발생형태_file)
         
         if csv_df is not None:
-            st.dataframe(csv_df)
\ No newline at end of file
+            st.dataframe(csv_df)
+# 이번 실행에서 계산된 단계 표시
+app.show_stage_log()
@@ -2,92 +2,23 @@ import pandas as pd
 import streamlit as st
 import plotly.express as px
 import os
+from pipeline import app, charts, filters, query
+from pipeline.schema import scale_mapping
 
-# 데이터 집계 함수 (캐싱)
-@st.cache_data
-def load_data():
-    data_folder = 'Data'
-    df_2023 = pd.read_excel(os.path.join(data_folder, '2023_산업재해통계_마이크로데이터_merged.xlsx'))
-    df_2022 = pd.read_csv(os.path.join(data_folder, '2022_산업재해통계_마이크로데이터_merged.csv'))
-    df_2021 = pd.read_csv(os.path.join(data_folder, '2021_산업재해통계_마이크로데이터_merged.csv'))
-    중업종리스트_df = pd.read_csv(os.path.join(data_folder, '중업종리스트.csv'))
-    
-    df = pd.concat([df_2023, df_2022, df_2021], axis=0, ignore_index=True)
-    df['통계기준년'] = df['통계기준년월'].astype(str).str[:4].astype(int)
-    df['대업종'] = df['대업종'].str.replace(r'\s+', '', regex=True)
-    df['대업종'] = df['대업종'].str.replace('전기·가스·증기및수도사업', '전기·가스·증기·수도사업')
-    df['중업종'] = df['중업종'].str.replace('출판·인쇄·제본또는인쇄물가공업', '출판·인쇄·제본업')
-    df['중업종'] = df['중업종'].str.replace('전기·가스·증기및수도사업', '전기·가스·증기·수도사업')
-    df['규모'] = df['규모'].str.replace('10~19인', '10~29인')
-    df['규모'] = df['규모'].str.replace('20~29인', '10~29인')
-
-    severity_mapping = {
-        '사망자': 400,
-        '6개월 이상': 200.0,
-        '91~180일': 135.5,
-        '29~90일': 59.5,
-        '15~28일': 21.5,
-        '8~14일': 11,
-        '4~7일': 5.5
-    }
-
-    df['재해정도_숫자'] = df['재해정도'].map(severity_mapping)
-   
-    # 근로자수 데이터 추가
-    df_rate = pd.read_csv(os.path.join(data_folder, '전체_재해_현황_및_분석규모별_산업별_중분류.csv'))
-    df_rate = df_rate[df_rate['중업종'] != '소계']
-    df_rate = df_rate[df_rate['항목'] == '근로자수 (명)']
-    # 중업종 값 정리
-    df_rate['중업종'] = df_rate['중업종'].str.replace(' ', '', regex=True)
-    df_rate['중업종'] = df_rate['중업종'].str.replace('전기·가스·증기및수도사업', '전기·가스·증기·수도사업')
-    # 대업종 값 정리 (공백 제거 부터)
-    df_rate['대업종'] = df_rate['대업종'].str.replace(r'\s+', '', regex=True)
-    df_rate['대업종'] = df_rate['대업종'].replace({
-        '전기·가스·증기및수도사업': '전기·가스·증기·수도사업',
-        '운수·창고및통신업': '운수·창고·통신업',
-    })
-    # 항목 열 제거
-    df_rate = df_rate.drop(columns=['항목'])
-    # 규모 관련 열 목록 정의
-    scale_columns = ['5인 미만', '5~9인', '10~29인', '30~49인', '50~99인',
-                    '100~299인', '300~499인', '500~999인', '1000인 이상']
-    # melt를 사용해 '규모'라는 이름으로 그룹화
-    df_rate_melted = df_rate.melt(
-        id_vars=['통계기준년', '대업종', '중업종'],
-        value_vars=scale_columns,
-        var_name='규모',
-        value_name='근로자수'
-    )
-    # 규모 값 정리, 근로자수 형태 변환
-    df_rate_melted['규모'] = df_rate_melted['규모'].str.replace('1000인 이상', '1,000인 이상')
-    df_rate_melted['근로자수'] = pd.to_numeric(df_rate_melted['근로자수'], errors='coerce')
-
-    return df, 중업종리스트_df, df_rate_melted
-
-# 데이터 로딩
-df, 중업종리스트_df, df_rate_melted = load_data()
+# 데이터 로딩 (모든 대시보드가 같은 스냅샷/캐시를 공유)
+dataset = app.load_data()
+df_cube = dataset.cube
+중업종리스트_df = dataset.중업종리스트_df
+result_cache = app.get_result_cache()
 
 # Streamlit 대시보드 설정
 st.title('재해정도 분석 대시보드')
 
-# 규모 매핑
-scale_mapping = {
-    '5인 미만': 1,
-    '5~9인': 2,
-    '10~29인': 3,
-    '30~49인': 4,
-    '50~99인': 5,
-    '100~299인': 6,
-    '300~499인': 7,
-    '500~999인': 8,
-    '1,000인 이상': 9  # Assuming 1,000 as the minimum for this range
-}
-
-규모_list = sorted(df['규모'].unique().tolist(), key=lambda x: scale_mapping.get(x, 0))  # 정렬 추가
-대업종_list = df['대업종'].unique().tolist()
-중업종_list = df['중업종'].unique().tolist()
-발생형태_list = df['발생형태'].unique().tolist()
-년도_list = df['통계기준년'].unique().tolist()
+규모_list = sorted(df_cube['규모'].unique().tolist(), key=lambda x: scale_mapping.get(x, 0))  # 정렬 추가
+대업종_list = df_cube['대업종'].unique().tolist()
+중업종_list = df_cube['중업종'].unique().tolist()
+발생형태_list = df_cube['발생형태'].unique().tolist()
+년도_list = df_cube['통계기준년'].unique().tolist()
 
 # 사용자 입력 multiselect
 # 규모 선택
@@ -104,7 +35,7 @@ selected_대업종 = st.multiselect(
 
 # 중업종 필터 (대업종에 따라 중업종 필터링)
 if selected_대업종:
-    filtered_middle_industries = df[df['대업종'].isin(selected_대업종)]['중업종'].unique().tolist()
+    filtered_middle_industries = df_cube[df_cube['대업종'].isin(selected_대업종)]['중업종'].unique().tolist()
 else:
     filtered_middle_industries = 중업종_list
 
@@ -129,50 +60,18 @@ selected_년도 = st.multiselect(
     default=년도_list if select_all_년도 else []
 )
 
-# 필터 적용 함수
-@st.cache_data
-def filter_and_select_columns(df, selected_규모, selected_대업종, selected_중업종, selected_발생형태, selected_년도):
-    filtered_df = df.copy()
-    selected_columns = ['통계기준년', '규모', '대업종', '중업종', '발생형태']
-
-    # 다중 선택 필터링 (선택 항목이 비어있지 않은 경우만 적용)
-    if selected_규모:
-        filtered_df = filtered_df[filtered_df['규모'].isin(selected_규모)]
-    else:
-        selected_columns.remove('규모')
-
-    if selected_대업종:
-        filtered_df = filtered_df[filtered_df['대업종'].isin(selected_대업종)]
-    else:
-        selected_columns.remove('대업종')
-
-    if selected_중업종:
-        filtered_df = filtered_df[filtered_df['중업종'].isin(selected_중업종)]
-    else:
-        selected_columns.remove('중업종')
-
-    if selected_발생형태:
-        filtered_df = filtered_df[filtered_df['발생형태'].isin(selected_발생형태)]
-    else:
-        selected_columns.remove('발생형태')
-
-    if selected_년도:
-        filtered_df = filtered_df[filtered_df['통계기준년'].isin(selected_년도)]
-    else:
-        selected_columns.remove('통계기준년')
-
-    return filtered_df, selected_columns
-
-
-
-
-# 필터링 및 그룹화 기준 설정 (df: 원본 데이터 - 필터링 후 동적 그룹화용)
-filtered_df, selected_columns = filter_and_select_columns(
-    df, selected_규모, selected_대업종, selected_중업종, selected_발생형태, selected_년도
-)
+selections = {
+    '통계기준년': selected_년도,
+    '규모': selected_규모,
+    '대업종': selected_대업종,
+    '중업종': selected_중업종,
+    '발생형태': selected_발생형태,
+}
+# 선택 항목이 있는 열만 그룹화 기준으로 사용
+selected_columns = filters.multiselect_columns(selections)
 
-# 전체 위험지수 합계 계산
-total_risk = df['재해정도_숫자'].sum()
+# 필터링 (df_cube: 집계 큐브 - 필터링 후 동적 롤업용)
+filtered_df = query.filter_cells(dataset, selections, selected_columns, result_cache)
 
 # 그룹화 및 정규화된 위험지수 계산
 try:
@@ -180,12 +79,7 @@ try:
         st.warning("선택된 필터가 없어 그룹화할 수 없습니다.")
         df_group = pd.DataFrame()
     else:
-        df_group = filtered_df.groupby(selected_columns).agg(
-            위험지수=('재해정도_숫자', 'sum'),
-            재해자수=('재해정도_숫자', 'count')
-        ).reset_index()
-
-        df_group['정규화된_위험지수'] = (df_group['위험지수'] / total_risk) * 10000
+        df_group = query.group_cells(dataset, filtered_df, selections, selected_columns, result_cache)
 
         # st.subheader("그룹화된 재해 통계")
         # st.dataframe(df_group.head(100).reset_index(drop=True))
@@ -195,28 +89,10 @@ except Exception as e:
     df_group = pd.DataFrame()
 
 
-# df_group과 같은 구조로 근로자수 그룹화
-# df_rate_melted를 df_group과 동일한 조건으로 필터링하려면
+# 근로자수 대응 및 파생 지표 계산
 try:
-    # 그룹 키 지정
-    merge_keys = [col for col in selected_columns if col != '발생형태']
-
     if not df_group.empty:
-        # merge를 위한 키만 추출
-        filtered_keys_df = filtered_df[merge_keys].drop_duplicates()
-        filtered_rate_df = pd.merge(df_rate_melted, filtered_keys_df, on=merge_keys, how='inner')
-
-        # 근로자수 그룹화
-        df_rate_melted_grouped = filtered_rate_df.groupby(merge_keys).sum(numeric_only=True).reset_index()
-        df_rate_melted_grouped = df_rate_melted_grouped[merge_keys + ['근로자수']]
-
-        # 병합
-        merged = df_rate_melted_grouped.merge(df_group, on=merge_keys, how='outer')
-
-        # 파생 지표 계산
-        merged['위험지수/근로자수'] = merged['위험지수'] / merged['근로자수']
-        merged['재해만인율'] = (merged['재해자수'] / merged['근로자수']) * 10000
-        merged = merged.sort_values(by='위험지수/근로자수', ascending=False)
+        merged = query.derive_metrics(dataset, df_group, selections, selected_columns, result_cache)
 
         st.subheader("병합된 통계 데이터")
         st.dataframe(merged.head(100).reset_index(drop=True))
@@ -228,8 +104,10 @@ except Exception as e:
     st.error(f"병합 또는 파생 변수 계산 중 오류 발생: {e}")
     merged = pd.DataFrame()
 
+app.show_cache_stats(result_cache)
+
 # 1중업종, 1발생형태 당 평균 정규화된_위험지수 계산
-risk_average = 10000/df['중업종'].nunique()/df['발생형태'].nunique()
+risk_average = query.risk_average(dataset)
 
 # 표
 st.subheader(f"표 (1 중업종, 1 발생형태 당 평균 정규화된_위험지수 = {risk_average:.2f})")
@@ -254,29 +132,34 @@ if st.button('그래프 그리기'):
     # 그래프를 그릴 때는 merged를 사용해야 함
     if x_axis == '규모':
         # 규모 열이 선택되었을 때는 scale_mapping 순서대로 정렬
-        merged['규모_숫자'] = merged['규모'].map(scale_mapping)
-        merged = merged.sort_values(by='규모_숫자')
+        # 캐시된 결과를 바꾸지 않도록 새 열은 assign으로 추가
+        merged = merged.assign(규모_숫자=merged['규모'].map(scale_mapping)).sort_values(by='규모_숫자')
     
+    # 선택 지표 상위 행만 그리고 나머지는 '기타' 막대로 합침
+    chart_df = charts.reduce_chart_data(merged, metric, x_axis, color_axis)
+
     # 그래프 그리기
     if graph_type == 'Bar':
         if color_axis == '없음':
-            fig = px.bar(merged, x=x_axis, y=metric, title=f'{metric} Bar 그래프')
+            fig = px.bar(chart_df, x=x_axis, y=metric, title=f'{metric} Bar 그래프')
         else:
-            fig = px.bar(merged, x=x_axis, y=metric, color=color_axis, title=f'{metric} Bar 그래프')
+            fig = px.bar(chart_df, x=x_axis, y=metric, color=color_axis, title=f'{metric} Bar 그래프')
             
     elif graph_type == 'Line':
         if color_axis == '없음':
-            fig = px.line(merged, x=x_axis, y=metric, title=f'{metric} Line 그래프')
+            fig = px.line(chart_df, x=x_axis, y=metric, title=f'{metric} Line 그래프')
         else:
-            fig = px.line(merged, x=x_axis, y=metric, color=color_axis, title=f'{metric} Line 그래프')
+            fig = px.line(chart_df, x=x_axis, y=metric, color=color_axis, title=f'{metric} Line 그래프')
             
     elif graph_type == 'Scatter':
         if color_axis == '없음':
-            fig = px.scatter(merged, x=x_axis, y=metric, title=f'{metric} Scatter 그래프')
+            fig = px.scatter(chart_df, x=x_axis, y=metric, title=f'{metric} Scatter 그래프')
         else:
-            fig = px.scatter(merged, x=x_axis, y=metric, color=color_axis, title=f'{metric} Scatter 그래프')
+            fig = px.scatter(chart_df, x=x_axis, y=metric, color=color_axis, title=f'{metric} Scatter 그래프')
         
-    st.plotly_chart(fig)
+    # x축이 통계기준년이어도 '기타' 막대가 빠지지 않도록 범주형 축으로 고정
+    st.plotly_chart(charts.category_xaxis(fig, chart_df, x_axis))
+    st.caption(charts.payload_caption(merged, chart_df, x_axis, metric))
 
 
 # 중업종 링크 표시 기능
@@ -348,4 +231,6 @@ if selected_중업종:
         csv_df = load_csv_file(selected_발생형태_file)
 
         if csv_df is not None:
-            st.dataframe(csv_df)
\ No newline at end of file
+            st.dataframe(csv_df)
+# 이번 실행에서 계산된 단계 표시
+app.show_stage_log()
@@ -0,0 +1 @@
+# 대시보드 공통 데이터 파이프라인
@@ -0,0 +1,174 @@
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import partial
+from urllib.parse import unquote
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from pipeline import response_cache
+
+# 공공데이터포털(한국산업안전보건공단) API 클라이언트
+# 세션 하나를 공유해 연결을 재사용(keep-alive)하고, 일시적인 오류는 백오프 후 재시도
+BASE_URL = os.environ.get('DASHBOARD_API_BASE_URL', 'https://apis.data.go.kr/B552468')
+
+MEDIA_LIST = 'selectMediaList/getselectMediaList'
+NEWS = 'news_api01/getNews_api01'
+DISASTER = 'disaster_api01/getdisaster_api'
+
+# 엔드포인트별 캐시 유효 기간 (초): 교육 자료 목록은 거의 바뀌지 않고, 사망 뉴스는 자주 갱신됨
+CACHE_TTL = {
+    MEDIA_LIST: 7 * 24 * 3600,
+    NEWS: 10 * 60,
+    DISASTER: 24 * 3600,
+}
+
+# 포털에서 발급한 키는 URL 인코딩된 형태이므로 풀어서 저장 (requests가 파라미터를 다시 인코딩)
+SERVICE_KEY = unquote(os.environ.get(
+    'DASHBOARD_API_KEY',
+    'XtjiWbPLxexBDUbR5RjQLsQ6M77Nrjt99CAFTlyV7CzsjfImD3yIqp7E9IGa%2Br2EFc%2F0FhabrGQ4AM%2Fc5uMOWg%3D%3D'
+))
+
+# (연결, 읽기) 제한 시간 (초)
+TIMEOUT = (5, 60)
+RETRIES = 3
+POOL_SIZE = 16
+# 동시에 실행하는 요청(및 후속 분석) 수 상한
+MAX_WORKERS = int(os.environ.get('DASHBOARD_API_WORKERS', 4))
+# 한 요청의 최대 행 수 (numOfRows가 너무 크면 서버가 실패하므로 이보다 많으면 여러 페이지로 나눠 받음)
+PAGE_SIZE = int(os.environ.get('DASHBOARD_API_PAGE_SIZE', 500))
+# 실패한 페이지만 다시 받는 횟수 (요청마다의 재시도와 별개)
+PAGE_ATTEMPTS = 3
+
+_lock = threading.Lock()
+_session = None
+
+
+def _new_session():
+    retry = Retry(
+        total=RETRIES, backoff_factor=0.5,
+        status_forcelist=[429, 500, 502, 503, 504], allowed_methods=['GET']
+    )
+    adapter = HTTPAdapter(max_retries=retry, pool_connections=4, pool_maxsize=POOL_SIZE)
+    session = requests.Session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    session.headers['accept'] = '*/*'
+    return session
+
+
+# 프로세스 전체에서 공유하는 세션 (연결 풀 포함)
+def session():
+    global _session
+    with _lock:
+        if _session is None:
+            _session = _new_session()
+        return _session
+
+
+# 엔드포인트 GET 요청, HTTP 오류면 requests.HTTPError
+def get(endpoint, headers=None, **params):
+    response = session().get(
+        f'{BASE_URL}/{endpoint}', params={'serviceKey': SERVICE_KEY, **params},
+        headers=headers, timeout=TIMEOUT
+    )
+    response.raise_for_status()
+    return response
+
+
+# 캐시를 거친 GET 요청의 JSON
+# - 유효 기간 안이면 서버에 묻지 않고 저장된 응답 사용
+# - 지났으면 ETag/Last-Modified로 조건부 요청 (304면 저장된 응답 재사용)
+# - 요청이 실패하거나 JSON이 아닌 오류 응답이 오면, 기간이 지났더라도 저장된 응답 사용
+# fresh=True면 기간과 관계없이 서버에 확인하고, 실패해도 저장된 응답으로 대신하지 않음 (백그라운드 갱신용)
+def get_json(endpoint, fresh=False, **params):
+    if not response_cache.enabled():
+        return get(endpoint, **params).json()
+
+    cache_key = response_cache.key(endpoint, params)
+    cached = response_cache.lookup(cache_key)
+    if cached and not fresh and time.time() - cached.fetched_at < CACHE_TTL.get(endpoint, 0):
+        return json.loads(cached.body)
+
+    headers = {}
+    if cached and cached.etag:
+        headers['If-None-Match'] = cached.etag
+    if cached and cached.last_modified:
+        headers['If-Modified-Since'] = cached.last_modified
+    try:
+        response = get(endpoint, headers=headers, **params)
+        if response.status_code == 304 and cached:
+            response_cache.touch(cache_key)
+            return json.loads(cached.body)
+        data = response.json()
+    except requests.RequestException:
+        if cached and not fresh:
+            return json.loads(cached.body)
+        raise
+    # 본문이 없는 오류 응답은 저장하지 않음
+    if isinstance(data, dict) and 'body' in data:
+        response_cache.store(
+            cache_key, response.text, response.headers.get('ETag'), response.headers.get('Last-Modified')
+        )
+    return data
+
+
+# {키: 인자 없는 함수} 작업을 최대 max_workers개씩 동시에 실행하고, 끝나는 순서대로 (키, future) 반환
+# 결과/예외는 호출한 스레드에서 future.result()로 꺼냄 (Streamlit 화면 갱신은 호출한 스레드에서만)
+def run_concurrently(tasks, max_workers=MAX_WORKERS):
+    executor = ThreadPoolExecutor(max_workers=min(max_workers, len(tasks)) or 1)
+    try:
+        futures = {executor.submit(fn): key for key, fn in tasks.items()}
+        for future in as_completed(futures):
+            yield futures[future], future
+    finally:
+        # 중간에 멈추면(재실행 등) 아직 시작하지 않은 작업은 취소
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+# 한 페이지의 body.items.item 목록 (마지막 페이지 뒤는 items가 비어 있고, 한 건이면 dict로 옴)
+def _page_items(endpoint, page_no, page_size, fresh, params):
+    data = get_json(endpoint, fresh=fresh, pageNo=page_no, numOfRows=page_size, **params)
+    items = data['body']['items']
+    if not items:
+        return []
+    item = items['item']
+    return item if isinstance(item, list) else [item]
+
+
+# num_rows건을 page_size 단위 페이지로 나눠 동시에 받고, 도착하는 대로 파싱해 페이지 순서대로 이어 붙임
+# 실패한 페이지만 PAGE_ATTEMPTS회까지 다시 받고, 그래도 실패하면 그 예외를 그대로 올림
+def fetch_items(endpoint, num_rows, page_size=PAGE_SIZE, fresh=False, **params):
+    page_size = min(page_size, num_rows)
+    pending = list(range(1, -(-num_rows // page_size) + 1))
+    pages, errors = {}, {}
+    for _ in range(PAGE_ATTEMPTS):
+        tasks = {page: partial(_page_items, endpoint, page, page_size, fresh, params) for page in pending}
+        errors = {}
+        for page, future in run_concurrently(tasks):
+            try:
+                pages[page] = future.result()
+            except requests.RequestException as e:
+                errors[page] = e
+        pending = sorted(errors)
+        if not pending:
+            break
+    if pending:
+        raise errors[pending[0]]
+    return [item for page in sorted(pages) for item in pages[page]][:num_rows]
+
+
+def media_items(ctgr03, num_rows, fresh=False):
+    return fetch_items(MEDIA_LIST, num_rows, fresh=fresh, ctgr03=ctgr03)
+
+
+def news_items(num_rows):
+    return fetch_items(NEWS, num_rows)
+
+
+def disaster_items(num_rows):
+    return fetch_items(DISASTER, num_rows)
@@ -0,0 +1,74 @@
+import threading
+
+import pandas as pd
+import streamlit as st
+
+from pipeline import cache, catalog, loader, trace
+
+# 데이터 집계 함수 (프로세스당 한 번 읽어 모든 세션이 같은 객체를 읽기 전용으로 공유)
+# shared 모드면 큐브가 memory-map된 스냅샷을 그대로 가리킴 (loader.LOAD_MODE)
+@st.cache_resource
+def _load_dataset(data_folder=loader.DATA_FOLDER):
+    return loader.load_dataset(data_folder)
+
+
+# 프로세스 안의 최신 데이터 (새 연도가 덧붙으면 모든 세션이 함께 사용)
+@st.cache_resource
+def _latest_data():
+    return {'lock': threading.Lock(), 'datasets': {}}
+
+
+# 실행 중인 세션도 재시작 없이 새 연도 파일을 반영 (새 연도 파티션만 읽어 덧붙임)
+# 모든 대시보드가 가장 먼저 호출하므로 여기서 이번 실행의 단계 기록을 시작하고,
+# 데이터를 읽은 뒤 교육 자료 목록 백그라운드 갱신도 시작 (프로세스당 한 번, 이미 실행 중이면 그대로)
+def load_data(data_folder=loader.DATA_FOLDER):
+    trace.start_run()
+    latest = _latest_data()
+    with latest['lock']:
+        with trace.stage('load_data'):
+            dataset = latest['datasets'].get(data_folder) or _load_dataset(data_folder)
+            dataset = loader.append_new_years(dataset, data_folder)
+        latest['datasets'][data_folder] = dataset
+    catalog.start_refresher()
+    return dataset
+
+
+# 필터/그룹/근로자수 결과 캐시 (모든 세션이 공유, DataFrame 해싱 없이 선택값 + 데이터 버전으로 키 생성)
+@st.cache_resource
+def get_result_cache():
+    return cache.LRUCache(maxsize=64)
+
+
+def show_cache_stats(result_cache):
+    cache_stats = result_cache.stats()
+    st.sidebar.caption(
+        f"결과 캐시: 적중 {cache_stats['hits']} · 미스 {cache_stats['misses']} · "
+        f"항목 {cache_stats['size']}/{cache_stats['maxsize']}"
+    )
+
+
+_STATUS_LABELS = {'ran': '계산', 'cache': '캐시', 'error': '오류'}
+
+
+def _format_stages(stages):
+    return ' · '.join(
+        f"{entry['stage']}({_STATUS_LABELS.get(entry['status'], entry['status'])} {entry['ms']:.0f}ms)"
+        for entry in stages
+    ) or '없음'
+
+
+# 전체 스크립트 실행에서 계산된 단계 + 단계별 시간/메모리 디버그 패널
+# (fragment 영역만 다시 실행되면 갱신되지 않음)
+def show_stage_log():
+    stages = trace.run_log()
+    st.sidebar.caption(f"실행된 단계: {_format_stages(stages)}")
+    with st.sidebar.expander("디버그: 단계별 성능"):
+        st.caption("이번 실행 (ms, 메모리 변화 MB)")
+        st.dataframe(pd.DataFrame(stages, columns=['stage', 'status', 'ms', 'memory_mb']), hide_index=True)
+        st.caption(f"모든 세션 최근 {trace.HISTORY_SIZE}회 기준 p50/p95 (ms)")
+        st.dataframe(pd.DataFrame(trace.percentiles(), columns=['stage', 'count', 'p50_ms', 'p95_ms']), hide_index=True)
+
+
+# fragment 영역이 실행될 때마다 그 영역에서 계산된 단계
+def show_section_log(stages):
+    st.caption(f"이 영역에서 실행된 단계: {_format_stages(stages)}")
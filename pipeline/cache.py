@@ -0,0 +1,52 @@
+import threading
+from collections import OrderedDict
+
+
+# 같은 선택이면 값의 순서와 관계없이 같은 키가 되도록 정규화
+def selection_key(selections):
+    return tuple(
+        (col, tuple(sorted(values, key=str)))
+        for col, values in sorted(selections.items())
+    )
+
+
+# 크기가 제한된 LRU 캐시
+# st.cache_data와 달리 DataFrame 인자를 해싱하지 않고, 호출자가 만든 키만 사용
+class LRUCache:
+    def __init__(self, maxsize=128):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_compute(self, key, compute):
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+
+        # 계산 중에는 잠금을 풀어 다른 세션이 기다리지 않도록 함
+        value = compute()
+
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'size': len(self._data),
+                'maxsize': self.maxsize,
+            }
@@ -0,0 +1,215 @@
+import json
+import logging
+import os
+import threading
+import time
+from functools import partial
+
+import pandas as pd
+import requests
+
+from pipeline import api
+
+# 사고유형별 교육 자료 목록 (발생형태/<사고유형>.csv: 제목, 링크, 날짜)
+# 백그라운드 스레드가 주기적으로 26개 사고유형을 모두 받아 바뀐 목록만 다시 쓰고,
+# 대시보드는 이 파일만 읽음 (파일이 없을 때만 API 직접 호출)
+logger = logging.getLogger('dashboard.catalog')
+
+CATALOG_DIR = os.environ.get('DASHBOARD_CATALOG_DIR', '발생형태')
+# 사고유형별로 받아 두는 자료 수 (대시보드 링크 개수 입력의 최댓값)
+CATALOG_ROWS = int(os.environ.get('DASHBOARD_CATALOG_ROWS', 1000))
+# 갱신 주기 (초), 0이면 백그라운드 갱신을 하지 않음
+REFRESH_SECONDS = int(os.environ.get('DASHBOARD_CATALOG_REFRESH', 24 * 3600))
+MANIFEST = 'manifest.json'
+
+COLUMNS = ['제목', '링크', '날짜']
+# 제목/날짜 열 → API item 필드 이름 후보 (대소문자 무시)
+FIELD_CANDIDATES = {
+    '제목': ['title', 'medname', 'subject'],
+    '날짜': ['regdate', 'reg_date', 'regdt', 'date'],
+}
+# 링크는 기존 목록과 같은 KOSHA 자료 상세 페이지 주소로 만듦 (item의 medSeq, codeCd, codeSeq 필드)
+LINK_FIELDS = ['medSeq', 'codeCd', 'codeSeq']
+LINK_URL = 'http://www.kosha.or.kr/aicuration/index.do?mode=detail&medSeq={medSeq}&codeCd={codeCd}&codeSeq={codeSeq}'
+
+
+# 사고유형 → ctgr03 코드
+CATEGORIES = {
+    "떨어짐": "11000001",
+    "넘어짐": "11000002",
+    "깔림.뒤집힘": "11000003",
+    "부딪힘": "11000004",
+    "물체에맞음": "11000005",
+    "무너짐": "11000006",
+    "끼임": "11000007",
+    "절단베임찔림": "11000008",
+    "감전": "11000009",
+    "폭발파열": "11000010",
+    "화재": "11000011",
+    "불균형및무리한동작": "11000012",
+    "이상온도물체접촉": "11000013",
+    "화학물질누출접촉": "11000014",
+    "산소결핍": "11000015",
+    "빠짐익사": "11000016",
+    "사업장내교통사고": "11000017",
+    "체육행사": "11000018",
+    "폭력행위": "11000019",
+    "동물상해": "11000020",
+    "기타": "11000021",
+    "사업장외교통사고": "11000022",
+    "업무상질병": "11000023",
+    "진폐등": "11000024",
+    "작업관련질병(뇌심등)": "11000025",
+    "분류불능": "11000026"
+}
+
+_lock = threading.Lock()
+_thread = None
+
+
+def _path(name, folder):
+    return os.path.join(folder, f'{name}.csv')
+
+
+# 저장된 목록 (앞에서부터 num_rows건), 파일이 없으면 None
+def read(name, num_rows=None, folder=CATALOG_DIR):
+    path = _path(name, folder)
+    if not os.path.exists(path):
+        return None
+    df = pd.read_csv(path, encoding='utf-8-sig')
+    return df if num_rows is None else df.head(num_rows)
+
+
+def read_manifest(folder=CATALOG_DIR):
+    path = os.path.join(folder, MANIFEST)
+    if not os.path.exists(path):
+        return {'refreshed_at': None, 'categories': {}}
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+# 임시 파일에 쓴 뒤 교체 (읽는 쪽은 항상 완성된 파일만 봄)
+def _replace(path, write):
+    tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+    write(tmp_path)
+    os.replace(tmp_path, path)
+
+
+def _write_manifest(manifest, folder):
+    def write(tmp_path):
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+    _replace(os.path.join(folder, MANIFEST), write)
+
+
+# API item 목록 → 제목/링크/날짜 표
+# 필요한 필드가 하나라도 없거나 목록이 비어 있으면 ValueError (기존 파일을 덮어쓰지 않도록)
+def to_catalog(items):
+    df = pd.DataFrame(items)
+    if df.empty:
+        raise ValueError('빈 자료 목록')
+    fields = {col.lower(): col for col in df.columns}
+    missing = []
+    source = {}
+    for column, candidates in FIELD_CANDIDATES.items():
+        source[column] = next((fields[c] for c in candidates if c in fields), None)
+        if source[column] is None:
+            missing.append(column)
+    link_fields = {name: fields.get(name.lower()) for name in LINK_FIELDS}
+    missing += [name for name, col in link_fields.items() if col is None]
+    if missing:
+        raise ValueError(f"item 필드를 찾지 못함: {', '.join(missing)} (받은 필드: {', '.join(map(str, df.columns))})")
+
+    links = df[list(link_fields.values())].astype(str).set_axis(list(link_fields), axis=1)
+    return pd.DataFrame({
+        '제목': df[source['제목']].astype(str),
+        '링크': [LINK_URL.format(**row) for row in links.to_dict('records')],
+        # 기존 파일과 같은 YYYYMMDD 형식 (2024-12-30, 2024.12.30 등도 허용)
+        '날짜': df[source['날짜']].astype(str).str.replace(r'\D', '', regex=True).str[:8],
+    })[COLUMNS]
+
+
+def _rows(df):
+    return set(df.astype(str).itertuples(index=False, name=None))
+
+
+# (추가된 행 수, 빠진 행 수, 파일을 다시 써야 하는지)
+def diff(old, new):
+    if old is None:
+        return len(new), 0, True
+    if list(old.columns) != list(new.columns):
+        return len(new), len(old), True
+    old_rows, new_rows = _rows(old), _rows(new)
+    added, removed = len(new_rows - old_rows), len(old_rows - new_rows)
+    # 내용이 같아도 순서가 바뀌었으면 다시 씀
+    changed = added or removed or not old.astype(str).reset_index(drop=True).equals(new.astype(str).reset_index(drop=True))
+    return added, removed, bool(changed)
+
+
+# 26개 사고유형 목록을 모두 받아 바뀐 파일만 교체하고, 받은 시각/변경 내역을 manifest.json에 기록
+def refresh(folder=CATALOG_DIR, num_rows=CATALOG_ROWS):
+    os.makedirs(folder, exist_ok=True)
+    manifest = read_manifest(folder)
+    now = time.strftime('%Y-%m-%dT%H:%M:%S')
+    # 캐시 유효 기간과 관계없이 서버에 확인 (실패한 유형은 기존 파일 유지)
+    tasks = {name: partial(api.media_items, code, num_rows, fresh=True) for name, code in CATEGORIES.items()}
+    for name, future in api.run_concurrently(tasks):
+        entry = manifest['categories'].setdefault(name, {})
+        entry['ctgr03'] = CATEGORIES[name]
+        try:
+            new = to_catalog(future.result())
+        except (requests.RequestException, KeyError, ValueError) as e:
+            # 받지 못했거나 형식이 다르면 기존 파일은 그대로 두고 오류만 기록
+            entry['error'] = str(e)
+            logger.warning('catalog %s: %s', name, e)
+            continue
+        added, removed, changed = diff(read(name, folder=folder), new)
+        if changed:
+            _replace(_path(name, folder), partial(new.to_csv, index=False, encoding='utf-8-sig'))
+            entry['changed_at'] = now
+        entry.update(fetched_at=now, rows=len(new), added=added, removed=removed, error=None)
+    manifest['refreshed_at'] = now
+    _write_manifest(manifest, folder)
+    return manifest
+
+
+def _seconds_since_refresh(folder):
+    refreshed_at = read_manifest(folder).get('refreshed_at')
+    if not refreshed_at:
+        return None
+    return time.time() - time.mktime(time.strptime(refreshed_at, '%Y-%m-%dT%H:%M:%S'))
+
+
+def _refresh_loop(folder, interval):
+    # 최근에 갱신했으면 (앱 재시작 등) 남은 시간만큼 기다린 뒤 시작
+    elapsed = _seconds_since_refresh(folder)
+    if elapsed is not None and elapsed < interval:
+        time.sleep(interval - elapsed)
+    while True:
+        try:
+            refresh(folder)
+        except Exception:
+            logger.exception('catalog refresh failed')
+        time.sleep(interval)
+
+
+# 프로세스당 하나의 데몬 스레드로 주기적 갱신 시작 (이미 실행 중이면 그대로 둠)
+def start_refresher(folder=CATALOG_DIR, interval=REFRESH_SECONDS):
+    global _thread
+    if interval <= 0:
+        return None
+    with _lock:
+        if _thread is None or not _thread.is_alive():
+            _thread = threading.Thread(
+                target=_refresh_loop, args=(folder, interval), name='catalog-refresher', daemon=True
+            )
+            _thread.start()
+        return _thread
+
+
+# 예약 작업(cron 등)용: python -m pipeline.catalog 로 한 번 갱신
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    result = refresh()
+    for name, entry in result['categories'].items():
+        print(name, entry.get('rows'), f"+{entry.get('added')} -{entry.get('removed')}", entry.get('error') or '')
@@ -0,0 +1,118 @@
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+
+from pipeline import metrics
+
+# 색상 기준 범주가 이보다 많으면 위험지수 합계 상위 범주만 따로 그리고 나머지는 '기타' trace 하나로 묶음
+MAX_COLOR_CATEGORIES = 20
+
+# 차트로 보내는 행 수 상한 (선택 지표 상위 행 + 나머지는 색상 범주별 '기타' 막대)
+CHART_TOP_N = 100
+# 합산 가능한 지표 (비율 지표는 합산 후 다시 계산)
+ADDITIVE_MEASURES = ['위험지수', '재해자수', '정규화된_위험지수']
+OTHER_LABEL = '기타'
+
+
+# 나머지 행을 색상 범주별 한 행으로 합치고 비율 지표를 다시 계산
+def _other_bucket(tail, group_columns):
+    tail = tail.assign(_bucket=0)
+    keys = group_columns + ['_bucket']
+    measures = [col for col in ADDITIVE_MEASURES if col in tail]
+    bucket = tail.groupby(keys, observed=True)[measures].sum()
+
+    if '근로자수' in tail:
+        # 발생형태만 다른 행은 같은 근로자수를 공유하므로 근로자수 기준 열 조합별로 한 번만 합산
+        worker_keys = [col for col in metrics.WORKER_DIMENSIONS if col in tail]
+        workers = tail.drop_duplicates(keys + worker_keys)
+        bucket['근로자수'] = workers.groupby(keys, observed=True)['근로자수'].sum()
+        if '위험지수' in bucket:
+            bucket['위험지수/근로자수'] = bucket['위험지수'] / bucket['근로자수']
+        if '재해자수' in bucket:
+            bucket['재해만인율'] = (bucket['재해자수'] / bucket['근로자수']) * 10000
+    return bucket.reset_index().drop(columns=['_bucket'])
+
+
+# 선택 지표 상위 top_n 행만 남기고 나머지는 x축 '기타' 막대로 합침 (브라우저로 보내는 데이터 크기 제한)
+def reduce_chart_data(df, metric, x_axis, color_axis, top_n=CHART_TOP_N):
+    if len(df) <= top_n or metric not in df:
+        return df
+    top = df[metric].reset_index(drop=True).nlargest(top_n).index
+    keep = np.zeros(len(df), dtype=bool)
+    keep[top] = True
+
+    group_columns = [color_axis] if color_axis in df and color_axis != x_axis else []
+    other = _other_bucket(df[~keep], group_columns)
+    other[x_axis] = f'{OTHER_LABEL} ({len(df) - len(top)}행)'
+    # x축 열을 문자열로 통일 (숫자 열(통계기준년)에 '기타' 문자열이 섞이지 않도록)
+    head = df[keep].astype({x_axis: str})
+    return pd.concat([head, other], ignore_index=True)
+
+
+# 차트로 보내는 데이터 크기 추정 (bytes)
+# 그림 전체를 다시 JSON으로 직렬화하지 않고, 지표마다 보내는 x/y 값의 문자열 길이로 계산
+def payload_size(chart_df, x_axis, metric):
+    metric = [metric] if isinstance(metric, str) else list(metric)
+    n = len(chart_df)
+    # 값마다 구분자(쉼표), x축 값은 따옴표까지
+    x_bytes = chart_df[x_axis].astype(str).str.encode('utf-8').str.len().sum() + 3 * n
+    y_bytes = sum(chart_df[m].astype(str).str.len().sum() + n for m in metric)
+    return int(len(metric) * x_bytes + y_bytes)
+
+
+# 축소 전후 행 수와 차트 데이터 크기 표시용 문구
+def payload_caption(df, chart_df, x_axis, metric):
+    return f"차트 데이터: {len(df):,}행 → {len(chart_df):,}행 · 약 {payload_size(chart_df, x_axis, metric) / 1024:,.0f} KB"
+
+
+# 색상 기준 열로 한 번만 나눈 (범주, 부분 DataFrame) 목록 (등장 순서 유지)
+def color_partitions(merged, color_axis, max_categories=MAX_COLOR_CATEGORIES):
+    partitions = [(category, part) for category, part in merged.groupby(color_axis, observed=True, sort=False)]
+    if len(partitions) <= max_categories:
+        return partitions
+
+    totals = merged.groupby(color_axis, observed=True)['위험지수'].sum()
+    keep = set(totals.nlargest(max_categories).index)
+    head = [(category, part) for category, part in partitions if category in keep]
+    tail = merged[~merged[color_axis].isin(keep)]
+    return head + [(f'기타 ({len(partitions) - len(head)}개)', tail)]
+
+
+# 지표별 subplot 막대그래프 (분할 결과를 모든 지표에서 재사용)
+def subplot_figure(merged, metric, x_axis, color_axis, max_categories=MAX_COLOR_CATEGORIES):
+    fig = make_subplots(
+        rows=len(metric), cols=1, shared_xaxes=True, vertical_spacing=0.1,
+        subplot_titles=metric
+    )
+    partitions = None if color_axis == '없음' else color_partitions(merged, color_axis, max_categories)
+
+    traces, rows = [], []
+    for i, m in enumerate(metric):
+        if partitions is None:
+            # 색상 기준 없음
+            traces.append(go.Bar(x=merged[x_axis].to_numpy(), y=merged[m].to_numpy(), name=m))
+            rows.append(i + 1)
+        else:
+            # 색상 기준이 있을 경우: 각 카테고리별 색상 표현
+            for category, part in partitions:
+                traces.append(go.Bar(
+                    x=part[x_axis].to_numpy(),
+                    y=part[m].to_numpy(),
+                    name=str(category),
+                    showlegend=(i == 0)  # 첫 row에만 범례 표시
+                ))
+                rows.append(i + 1)
+    # trace를 한 번에 추가 (add_trace 반복보다 검증/복사 비용이 적음)
+    fig.add_traces(traces, rows=rows, cols=[1] * len(traces))
+    for i, m in enumerate(metric):
+        fig.update_yaxes(title_text=m, row=i + 1, col=1)
+    return category_xaxis(fig, merged, x_axis)
+
+
+# 통계기준년처럼 숫자 모양인 x축은 plotly가 선형 축으로 그리면서 '기타' 막대(문자열)를 빼 버리므로
+# 범주형 축으로 고정하고 값 순서(연도 → '기타')대로 정렬 (문자열 x축은 그대로 등장 순서)
+def category_xaxis(fig, chart_df, x_axis):
+    if pd.to_numeric(chart_df[x_axis], errors='coerce').notna().any():
+        fig.update_xaxes(type='category', categoryorder='category ascending')
+    return fig
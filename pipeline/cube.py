@@ -0,0 +1,21 @@
+# 재해 마이크로데이터를 (년, 규모, 대업종, 중업종, 발생형태) 단위로 미리 집계한 큐브
+CUBE_DIMENSIONS = ['통계기준년', '규모', '대업종', '중업종', '발생형태']
+MEASURES = ['위험지수', '재해자수']
+
+
+def build_cube(df):
+    # dropna=False: 일부 차원이 비어 있는 행도 합계에 포함되도록 유지
+    return df.groupby(CUBE_DIMENSIONS, observed=True, dropna=False).agg(
+        위험지수=('재해정도_숫자', 'sum'),
+        재해자수=('재해정도_숫자', 'count')
+    ).reset_index()
+
+
+# 같은 차원의 부분 큐브들을 이어 붙인 뒤 셀 단위로 다시 합산 (두 지표 모두 합산 가능)
+def merge_cubes(cube):
+    return cube.groupby(CUBE_DIMENSIONS, observed=True, dropna=False)[MEASURES].sum().reset_index()
+
+
+# 필터링된 큐브를 그룹화 기준 열로 롤업 (원본 행 수가 아닌 셀 수에 비례)
+def rollup(cube, group_columns):
+    return cube.groupby(group_columns, observed=True)[MEASURES].sum().reset_index()
@@ -0,0 +1,147 @@
+import os
+import sqlite3
+import threading
+from contextlib import closing
+
+import pandas as pd
+
+from pipeline import cube, metrics
+
+# 여러 앱 인스턴스가 같은 DB 파일을 읽기 전용으로 공유
+DATABASE_PATH = os.environ.get('DASHBOARD_DATABASE', os.path.join('Data', '.snapshot', 'dashboard.sqlite'))
+
+_lock = threading.Lock()
+_ready = set()
+
+
+def _quote(col):
+    return '"' + col.replace('"', '""') + '"'
+
+
+# numpy 값은 sqlite 파라미터로 넘길 수 없으므로 파이썬 값으로 변환
+def _param(value):
+    return value.item() if hasattr(value, 'item') else value
+
+
+def _stored_version(path):
+    if not os.path.exists(path):
+        return None
+    try:
+        with closing(sqlite3.connect(f'file:{path}?mode=ro', uri=True)) as conn:
+            return conn.execute('SELECT version FROM meta').fetchone()[0]
+    except sqlite3.Error:
+        return None
+
+
+def _to_table(df):
+    # 범주형 열은 TEXT로 저장
+    return df.astype({col: object for col in df.columns if isinstance(df[col].dtype, pd.CategoricalDtype)})
+
+
+# 큐브 셀과 근로자수 큐브를 임시 파일에 쓴 뒤 교체 (읽는 쪽은 항상 완성된 파일만 봄)
+def _build(dataset, path):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    with closing(sqlite3.connect(tmp_path)) as conn:
+        _to_table(dataset.cube).to_sql('cube', conn, index=False)
+        _to_table(dataset.worker_cube).to_sql('workers', conn, index=False)
+        for col in cube.CUBE_DIMENSIONS:
+            conn.execute(f'CREATE INDEX {_quote("cube_" + col)} ON cube ({_quote(col)})')
+        conn.execute('CREATE TABLE meta (version TEXT)')
+        conn.execute('INSERT INTO meta VALUES (?)', (dataset.version,))
+        conn.commit()
+    os.replace(tmp_path, path)
+
+
+# 데이터 버전이 바뀌었으면 DB 파일을 다시 만든 뒤 읽기 전용 연결로 조회
+def read_query(dataset, sql, params, path=DATABASE_PATH):
+    with _lock:
+        if (path, dataset.version) not in _ready:
+            if _stored_version(path) != dataset.version:
+                _build(dataset, path)
+            _ready.add((path, dataset.version))
+    with closing(sqlite3.connect(f'file:{path}?mode=ro', uri=True)) as conn:
+        return pd.read_sql_query(sql, conn, params=params)
+
+
+# 선택값 → WHERE 절 (차원 안에서는 IN, 차원 간에는 AND)
+def _where(selections, columns):
+    clauses, params = [], []
+    for col, values in selections.items():
+        if col in columns and values:
+            clauses.append(f'{_quote(col)} IN ({", ".join("?" * len(values))})')
+            params.extend(_param(value) for value in values)
+    return (' WHERE ' + ' AND '.join(clauses)) if clauses else '', params
+
+
+def _group_sql(selections, selected_columns):
+    columns = ', '.join(_quote(col) for col in selected_columns)
+    where, params = _where(selections, cube.CUBE_DIMENSIONS)
+    # pandas groupby처럼 그룹 열이 비어 있는 셀은 제외
+    not_null = ' AND '.join(f'{_quote(col)} IS NOT NULL' for col in selected_columns)
+    where = f'{where} AND {not_null}' if where else f' WHERE {not_null}'
+    sql = (
+        f'SELECT {columns}, SUM("위험지수") AS "위험지수", SUM("재해자수") AS "재해자수", '
+        f'SUM("위험지수") / (SELECT SUM("위험지수") FROM cube) * 10000 AS "정규화된_위험지수" '
+        f'FROM cube{where} GROUP BY {columns}'
+    )
+    return sql, params
+
+
+# 그룹 열을 큐브와 같은 범주형으로 되돌림 (정렬 순서도 pandas 결과와 같게)
+def _restore_dtypes(df, dataset, columns):
+    for col in columns:
+        dtype = dataset.cube[col].dtype
+        if isinstance(dtype, pd.CategoricalDtype):
+            df[col] = pd.Categorical(df[col], dtype=dtype)
+    return df
+
+
+# 그룹화 및 정규화된_위험지수 (query.group_cells와 같은 결과)
+def group_cells(dataset, selections, selected_columns):
+    sql, params = _group_sql(selections, selected_columns)
+    df_group = read_query(dataset, sql, params)
+    df_group = _restore_dtypes(df_group, dataset, selected_columns)
+    return df_group.sort_values(by=selected_columns, kind='stable').reset_index(drop=True)
+
+
+# pandas 나눗셈과 같게 x/0 은 inf (SQLite는 NULL을 돌려주므로 9e999 = inf 로 대체)
+def _ratio(numerator, denominator):
+    return f'(CASE WHEN {denominator} = 0 AND {numerator} > 0 THEN 9e999 ELSE {numerator} / {denominator} END)'
+
+
+# 필터, 그룹화, 근로자수 join, 파생 지표를 하나의 SQL로 계산 (query.derive_metrics와 같은 열 구성)
+def derive_metrics(dataset, selections, selected_columns):
+    merge_keys = [col for col in selected_columns if col in metrics.WORKER_DIMENSIONS]
+    other_columns = [col for col in selected_columns if col not in merge_keys]
+    group_sql, params = _group_sql(selections, selected_columns)
+    worker_where, worker_params = _where(selections, metrics.WORKER_DIMENSIONS)
+
+    if merge_keys:
+        keys = ', '.join(_quote(col) for col in merge_keys)
+        workers_sql = f'SELECT {keys}, SUM("근로자수") AS "근로자수" FROM workers{worker_where} GROUP BY {keys}'
+        join = f'LEFT JOIN w USING ({keys})'
+    else:
+        # 근로자수 기준 열이 없으면 전체 합계를 모든 행에 적용
+        workers_sql = f'SELECT SUM("근로자수") AS "근로자수" FROM workers{worker_where}'
+        join = 'CROSS JOIN w'
+
+    output = [f'g.{_quote(col)}' for col in merge_keys] + ['w."근로자수"']
+    output += [f'g.{_quote(col)}' for col in other_columns]
+    output += ['g."위험지수"', 'g."재해자수"', 'g."정규화된_위험지수"']
+    output += [
+        _ratio('g."위험지수"', 'w."근로자수"') + ' AS "위험지수/근로자수"',
+        _ratio('g."재해자수" * 1.0', 'w."근로자수"') + ' * 10000 AS "재해만인율"',
+    ]
+    sql = (
+        f'WITH g AS ({group_sql}), w AS ({workers_sql}) '
+        f'SELECT {", ".join(output)} '
+        f'FROM g {join} ORDER BY "위험지수/근로자수" DESC'
+    )
+    merged = read_query(dataset, sql, params + worker_params)
+    # 값이 모두 NULL이면 object 열이 되므로 실수형으로 고정
+    ratio_columns = ['근로자수', '위험지수/근로자수', '재해만인율']
+    merged[ratio_columns] = merged[ratio_columns].astype(float)
+    return _restore_dtypes(merged, dataset, selected_columns)
@@ -0,0 +1,42 @@
+import numpy as np
+
+from pipeline import index as row_index
+
+FILTER_COLUMNS = ['통계기준년', '규모', '대업종', '중업종', '발생형태']
+
+
+# {열: 선택값 목록} 을 하나의 boolean mask로 결합 (빈 목록은 필터하지 않음)
+def selection_mask(df, selections):
+    mask = np.ones(len(df), dtype=bool)
+    for col, values in selections.items():
+        if values:
+            mask &= df[col].isin(values).to_numpy()
+    return mask
+
+
+# 전체 표를 복사하지 않고 선택된 행과 필요한 열만 추출
+# index가 주어지면 mask 대신 역색인으로 행 위치를 계산
+def select_rows(df, selections, columns=None, index=None):
+    if not any(selections.values()):
+        return df if columns is None else df[columns]
+    if index is not None:
+        positions = row_index.lookup(index, selections)
+        if columns is None:
+            return df.iloc[positions]
+        return df.iloc[positions, df.columns.get_indexer(columns)]
+    mask = selection_mask(df, selections)
+    if columns is None:
+        return df.loc[mask]
+    return df.loc[mask, columns]
+
+
+# multiselect: 선택 항목이 있는 열만 그룹화 기준으로 사용
+def multiselect_columns(selections):
+    return [col for col in FILTER_COLUMNS if selections[col]]
+
+
+# selectbox: '없음'은 그룹화에서 제외, '전체'는 필터 없이 그룹화, 그 외 값은 필터 적용
+def from_selectbox(choices):
+    selected_columns = [col for col in FILTER_COLUMNS if choices[col] != '없음']
+    selections = {col: [value] for col, value in choices.items() if value not in ('없음', '전체')}
+    return selections, selected_columns
@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+
+INDEX_COLUMNS = ['통계기준년', '규모', '대업종', '중업종', '발생형태']
+
+
+# 열 값 → 그 값을 가진 행 위치(정렬된 int32 배열) 역색인
+def build_index(df, columns=INDEX_COLUMNS):
+    postings = {}
+    for col in columns:
+        codes, uniques = pd.factorize(df[col])
+        # stable 정렬이라 같은 값 안에서는 행 위치가 오름차순으로 유지됨
+        order = np.argsort(codes, kind='stable').astype(np.int32)
+        counts = np.bincount(codes[codes >= 0], minlength=len(uniques))
+        # 결측(code -1) 행은 맨 앞에 모이므로 건너뜀
+        bounds = np.concatenate([[0], np.cumsum(counts)]) + np.count_nonzero(codes < 0)
+        postings[col] = {value: order[bounds[i]:bounds[i + 1]] for i, value in enumerate(uniques)}
+    return {'n_rows': len(df), 'postings': postings}
+
+
+# 큐브 뒤에 덧붙인 행(offset부터)의 역색인만 만들어 기존 역색인에 합침
+def extend_index(row_index, df_new, offset, columns=INDEX_COLUMNS):
+    new_index = build_index(df_new, columns)
+    postings = {}
+    for col in columns:
+        col_postings = dict(row_index['postings'][col])
+        for value, positions in new_index['postings'][col].items():
+            # 새 행 위치는 모두 기존 행보다 뒤이므로 이어 붙여도 정렬이 유지됨
+            positions = positions + np.int32(offset)
+            if value in col_postings:
+                positions = np.concatenate([col_postings[value], positions])
+            col_postings[value] = positions
+        postings[col] = col_postings
+    return {'n_rows': row_index['n_rows'] + new_index['n_rows'], 'postings': postings}
+
+
+# 차원 안에서는 OR(합집합), 차원 간에는 AND(교집합)로 행 위치 계산
+# 필터가 하나도 없으면 None
+def lookup(index, selections):
+    candidates = []
+    for col, values in selections.items():
+        if not values:
+            continue
+        col_postings = index['postings'][col]
+        parts = [col_postings[value] for value in values if value in col_postings]
+        # 같은 차원의 값끼리는 행이 겹치지 않으므로 이어 붙여 정렬만 하면 됨
+        positions = np.sort(np.concatenate(parts)) if parts else np.empty(0, dtype=np.int32)
+        candidates.append(positions)
+
+    if not candidates:
+        return None
+    # 가장 작은 집합부터 교집합
+    candidates.sort(key=len)
+    result = candidates[0]
+    for positions in candidates[1:]:
+        if result.size == 0:
+            break
+        result = np.intersect1d(result, positions, assume_unique=True)
+    return result
@@ -0,0 +1,267 @@
+import hashlib
+import importlib.util
+import os
+import re
+import subprocess
+import sys
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+import openpyxl
+import pandas as pd
+
+from pipeline import cube, index, metrics, normalize, schema, snapshot
+
+DATA_FOLDER = 'Data'
+# <년도>_산업재해통계_마이크로데이터_merged.xlsx / .csv 파일을 자동으로 찾음
+MICRODATA_PATTERN = re.compile(r'^(\d{4})_산업재해통계_마이크로데이터_merged\.(xlsx|csv)$')
+# 큐브 파티션 스냅샷(cube_<년도>, cube)의 열 구성/dtype이 바뀌면 올림
+SNAPSHOT_VERSION = 4
+# 규모별·산업별 근로자수 통계 파일
+WORKER_COUNTS_FILE = '전체_재해_현황_및_분석규모별_산업별_중분류.csv'
+
+# 대시보드가 사용하는 데이터 묶음
+Dataset = namedtuple('Dataset', ['cube', 'index', 'worker_cube', '중업종리스트_df', 'version', 'years'])
+
+# pyarrow가 있으면 멀티스레드 pyarrow CSV 파서 사용 (더 빠르지만 최대 메모리는 'c'가 더 적음)
+CSV_ENGINE = os.environ.get('DASHBOARD_CSV_ENGINE') or ('pyarrow' if importlib.util.find_spec('pyarrow') else 'c')
+
+# 'full': 연도 파일 전체를 읽어 집계 / 'stream': chunk 단위로 읽으며 큐브에 누적 (작은 컨테이너용)
+INGEST_MODE = os.environ.get('DASHBOARD_INGEST_MODE', 'full')
+CHUNK_ROWS = int(os.environ.get('DASHBOARD_CHUNK_ROWS', 200_000))
+
+# 어느 모드든 데이터는 프로세스당 한 번 읽어 모든 세션이 공유
+# 'memory': 큐브를 힙 메모리로 복사 / 'shared': memory-map된 스냅샷을 그대로 가리킴 (같은 파일을 여는 프로세스끼리 페이지 공유)
+LOAD_MODE = os.environ.get('DASHBOARD_LOAD_MODE', 'memory')
+
+
+# 필요한 열만 고정 dtype으로 읽음 (범주 열은 파싱 단계에서 바로 정수 코드로 저장)
+def _read_file(path):
+    columns = list(schema.MICRODATA_DTYPES)
+    if path.endswith('.xlsx'):
+        return pd.read_excel(path, usecols=columns, dtype=schema.MICRODATA_DTYPES)
+    return pd.read_csv(path, usecols=columns, dtype=schema.MICRODATA_DTYPES, engine=CSV_ENGINE)
+
+
+# 데이터 폴더의 연도별 마이크로데이터 파일 목록 (최신 연도 먼저)
+def microdata_files(data_folder=DATA_FOLDER):
+    files = {}
+    for name in os.listdir(data_folder):
+        match = MICRODATA_PATTERN.match(name)
+        # 같은 연도에 xlsx와 csv가 모두 있으면 csv 사용
+        if match and (match.group(1) not in files or match.group(2) == 'csv'):
+            files[match.group(1)] = os.path.join(data_folder, name)
+    return [files[year] for year in sorted(files, reverse=True)]
+
+
+# 읽은 행에 통계기준년, 값 정리, 재해정도_숫자 적용
+def _prepare(df):
+    df['통계기준년'] = normalize.year_from_month(df['통계기준년월'])
+    # 값 정리는 고유값 단위로 한 번만 (규칙: pipeline/normalization.json)
+    df = normalize.apply_rules(df, normalize.load_rules()['microdata'])
+
+    df['재해정도_숫자'] = df['재해정도'].map(schema.severity_mapping).astype(float)
+    return df
+
+
+# 한 연도 파일을 읽어 값 정리까지 마침 (프로세스 풀에서 실행)
+def read_year(path):
+    return _prepare(_read_file(path))
+
+
+# xlsx는 openpyxl read-only 모드로 행을 순서대로 읽어 chunksize 행씩 반환
+def _iter_excel(path, chunksize):
+    workbook = openpyxl.load_workbook(path, read_only=True)
+    try:
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        header = list(next(rows))
+        positions = [header.index(col) for col in schema.MICRODATA_DTYPES]
+        batch = []
+        for row in rows:
+            batch.append([row[i] for i in positions])
+            if len(batch) == chunksize:
+                yield pd.DataFrame(batch, columns=list(schema.MICRODATA_DTYPES)).astype(schema.MICRODATA_DTYPES)
+                batch = []
+        if batch:
+            yield pd.DataFrame(batch, columns=list(schema.MICRODATA_DTYPES)).astype(schema.MICRODATA_DTYPES)
+    finally:
+        workbook.close()
+
+
+def _iter_file(path, chunksize):
+    if path.endswith('.xlsx'):
+        return _iter_excel(path, chunksize)
+    # pyarrow 엔진은 chunksize를 지원하지 않으므로 C 파서 사용
+    return pd.read_csv(path, usecols=list(schema.MICRODATA_DTYPES), dtype=schema.MICRODATA_DTYPES,
+                       chunksize=chunksize)
+
+
+# 파일을 chunk 단위로 읽어 바로 큐브에 누적 (메모리는 행 수가 아닌 셀 수에 비례)
+def stream_year_cube(path, chunksize=CHUNK_ROWS):
+    df_cube = None
+    for chunk in _iter_file(path, chunksize):
+        chunk_cube = cube.build_cube(_prepare(chunk))
+        df_cube = chunk_cube if df_cube is None else cube.merge_cubes(_concat_categorical([df_cube, chunk_cube]))
+    return schema.to_categorical(df_cube)
+
+
+# 연도별 범주를 합쳐 두어 concat 후에도 범주형(정수 코드)이 유지되도록 함
+# 입력 DataFrame은 바꾸지 않음 (캐시된 큐브를 그대로 넘겨도 안전)
+def _concat_categorical(frames):
+    frames = [df.copy(deep=False) for df in frames]
+    for col in frames[0].columns:
+        if not all(isinstance(df[col].dtype, pd.CategoricalDtype) for df in frames if col in df):
+            continue
+        categories = pd.Index([])
+        for df in frames:
+            if col in df:
+                categories = categories.union(df[col].cat.categories, sort=False)
+        for df in frames:
+            if col in df:
+                df[col] = df[col].cat.set_categories(categories)
+    df = pd.concat(frames, axis=0, ignore_index=True)
+    return schema.to_categorical(df)
+
+
+# 규모별·산업별 근로자수 통계를 (통계기준년, 대업종, 중업종, 규모) 형태로 정리
+def read_worker_counts(data_folder=DATA_FOLDER):
+    df_rate = pd.read_csv(os.path.join(data_folder, WORKER_COUNTS_FILE))
+    df_rate = df_rate[df_rate['중업종'] != '소계']
+    df_rate = df_rate[df_rate['항목'] == '근로자수 (명)']
+    # 중업종/대업종 값 정리 (규칙: pipeline/normalization.json)
+    rules = normalize.load_rules()['worker_counts']
+    df_rate = normalize.apply_rules(df_rate, {col: rules[col] for col in ['중업종', '대업종']})
+    # 항목 열 제거
+    df_rate = df_rate.drop(columns=['항목'])
+    # 규모 관련 열 목록 정의
+    scale_columns = ['5인 미만', '5~9인', '10~29인', '30~49인', '50~99인',
+                    '100~299인', '300~499인', '500~999인', '1000인 이상']
+    # melt를 사용해 '규모'라는 이름으로 그룹화
+    df_rate_melted = df_rate.melt(
+        id_vars=['통계기준년', '대업종', '중업종'],
+        value_vars=scale_columns,
+        var_name='규모',
+        value_name='근로자수'
+    )
+    # 규모 값 정리, 근로자수 형태 변환
+    df_rate_melted['규모'] = normalize.normalize_column(df_rate_melted['규모'], rules['규모'])
+    df_rate_melted['근로자수'] = pd.to_numeric(df_rate_melted['근로자수'], errors='coerce')
+    return df_rate_melted
+
+
+def _snapshot_dir(data_folder):
+    return os.path.join(data_folder, '.snapshot')
+
+
+def _year(path):
+    return int(MICRODATA_PATTERN.match(os.path.basename(path)).group(1))
+
+
+def _partition_name(path):
+    return f'cube_{_year(path)}'
+
+
+# 스냅샷을 만든 입력 파일: 원본 파일 + 값 정리 규칙 (규칙 파일만 고쳐도 다시 생성되도록)
+def _sources(paths):
+    return list(paths) + [normalize.RULES_PATH]
+
+
+# 연도 하나의 집계 큐브 파티션 (원본 파일이나 규칙 파일이 바뀐 경우만 다시 생성)
+def load_partition(path, data_folder=DATA_FOLDER):
+    return snapshot.load_or_build(
+        _partition_name(path), _sources([path]),
+        lambda: (stream_year_cube(path) if INGEST_MODE == 'stream'
+                 else cube.build_cube(schema.to_categorical(read_year(path)))),
+        version=SNAPSHOT_VERSION, snapshot_dir=_snapshot_dir(data_folder),
+    )
+
+
+# 작업 프로세스: 새 파이썬 인터프리터에서 파티션 스냅샷만 만들고 결과는 파일로 넘김
+# - Streamlit 프로세스는 항상 여러 스레드(교육 자료 갱신 등)가 실행 중이라 fork로 복제하면
+#   다른 스레드가 잡고 있던 잠금이 잠긴 채로 복사될 수 있음
+# - multiprocessing의 spawn/forkserver는 작업 프로세스마다 __main__을 다시 실행하는데,
+#   Streamlit은 __main__을 대시보드 스크립트로 바꿔 두므로 대시보드 전체가 다시 실행됨
+# 환경 변수(DASHBOARD_INGEST_MODE 등)와 작업 디렉터리는 그대로 물려받음
+def _build_partition(path, data_folder):
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [root, os.environ.get('PYTHONPATH')])))
+    subprocess.run([sys.executable, '-m', 'pipeline.loader', path, data_folder], env=env, check=True)
+
+
+# 오래된 파티션만 작업 프로세스에서 병렬로 다시 만든 뒤, 연도 순서대로 읽음
+def load_partitions(paths, data_folder=DATA_FOLDER):
+    paths = sorted(paths, key=_year)
+    stale = [path for path in paths if not snapshot.is_fresh(
+        _partition_name(path), _sources([path]), SNAPSHOT_VERSION, _snapshot_dir(data_folder))]
+    if len(stale) > 1:
+        with ThreadPoolExecutor(max_workers=min(len(stale), os.cpu_count() or 1)) as pool:
+            list(pool.map(_build_partition, stale, [data_folder] * len(stale)))
+    return [load_partition(path, data_folder) for path in paths]
+
+
+# 연도별 파티션을 합친 집계 큐브도 스냅샷으로 저장해 두어 원본 행 데이터를 메모리에 올리지 않고 시작
+def load_cube(data_folder=DATA_FOLDER):
+    paths = microdata_files(data_folder)
+    return snapshot.load_or_build(
+        'cube', _sources(paths), lambda: _concat_categorical(load_partitions(paths, data_folder)),
+        version=SNAPSHOT_VERSION, snapshot_dir=_snapshot_dir(data_folder),
+        zero_copy=LOAD_MODE == 'shared',
+    )
+
+
+# 필터/집계 결과 캐시 키와 SQLite DB 파일에 쓰는 데이터 버전
+# (큐브 스냅샷 토큰 + 근로자수 통계 파일 내용, 어느 쪽이 바뀌어도 달라짐)
+def dataset_version(data_folder=DATA_FOLDER):
+    tokens = [
+        snapshot.version_token('cube', _snapshot_dir(data_folder)),
+        snapshot.file_fingerprint(os.path.join(data_folder, WORKER_COUNTS_FILE))['sha256'],
+    ]
+    return hashlib.sha256(repr(tokens).encode('utf-8')).hexdigest()[:16]
+
+
+# 모든 대시보드가 공유하는 데이터 로딩
+def load_dataset(data_folder=DATA_FOLDER):
+    # 재해 집계 큐브 (필터/그룹화는 원본 행 대신 큐브 셀에서 계산)
+    df_cube = load_cube(data_folder)
+    return Dataset(
+        cube=df_cube,
+        # 필터용 역색인 (값 → 큐브 행 위치)
+        index=index.build_index(df_cube),
+        # (년, 규모, 대업종, 중업종) 별 근로자수를 미리 집계 (재실행마다 merge하지 않음)
+        worker_cube=metrics.build_worker_cube(read_worker_counts(data_folder)),
+        중업종리스트_df=pd.read_csv(os.path.join(data_folder, '중업종리스트.csv')),
+        # 결과 캐시 키에 쓰는 데이터 버전
+        version=dataset_version(data_folder),
+        years=tuple(sorted(_year(path) for path in microdata_files(data_folder))),
+    )
+
+
+# 새 연도 파일이 생기면 그 연도만 읽어 큐브와 역색인에 덧붙임 (기존 연도는 다시 처리하지 않음)
+# 새 연도가 없으면 dataset을 그대로 반환
+def append_new_years(dataset, data_folder=DATA_FOLDER):
+    paths = [path for path in microdata_files(data_folder) if _year(path) not in dataset.years]
+    if not paths:
+        return dataset
+    if LOAD_MODE == 'shared':
+        # 힙 복사본으로 덧붙이지 않고, 새 파티션을 만든 뒤 합친 큐브 스냅샷을 다시 memory-map
+        load_partitions(paths, data_folder)
+        return load_dataset(data_folder)
+
+    df_cube, row_index = dataset.cube, dataset.index
+    tokens = [dataset.version]
+    for path, partition in zip(sorted(paths, key=_year), load_partitions(paths, data_folder)):
+        row_index = index.extend_index(row_index, partition, offset=len(df_cube))
+        df_cube = _concat_categorical([df_cube, partition])
+        tokens.append(snapshot.version_token(_partition_name(path), _snapshot_dir(data_folder)))
+
+    return dataset._replace(
+        cube=df_cube,
+        index=row_index,
+        version=hashlib.sha256(repr(tokens).encode('utf-8')).hexdigest()[:16],
+        years=tuple(sorted(dataset.years + tuple(_year(path) for path in paths))),
+    )
+
+
+# 작업 프로세스 진입점: python -m pipeline.loader <원본 파일> <데이터 폴더>
+if __name__ == '__main__':
+    load_partition(sys.argv[1], sys.argv[2])
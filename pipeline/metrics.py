@@ -0,0 +1,46 @@
+import pandas as pd
+
+from pipeline import filters, trace
+
+# 근로자수 통계의 차원 (발생형태 없음)
+WORKER_DIMENSIONS = ['통계기준년', '규모', '대업종', '중업종']
+
+
+# (년, 규모, 대업종, 중업종) 별 근로자수 큐브
+def build_worker_cube(df_rate_melted):
+    return df_rate_melted.groupby(WORKER_DIMENSIONS, observed=True)['근로자수'].sum().reset_index()
+
+
+def _key_index(df, keys):
+    if len(keys) == 1:
+        return pd.Index(df[keys[0]])
+    return pd.MultiIndex.from_frame(df[keys])
+
+
+# df_group의 각 행에 대응하는 근로자수 (merge 없이 정렬된 인덱스로 맞춤)
+def worker_counts(df_group, worker_cube, selections, selected_columns):
+    merge_keys = [col for col in selected_columns if col in WORKER_DIMENSIONS]
+    worker_selections = {col: values for col, values in selections.items() if col in WORKER_DIMENSIONS}
+    workers = filters.select_rows(worker_cube, worker_selections, merge_keys + ['근로자수'])
+
+    if not merge_keys:
+        # 근로자수 기준 열이 없으면 전체 합계를 모든 행에 적용
+        return pd.Series(workers['근로자수'].sum(), index=df_group.index)
+
+    denominators = workers.groupby(merge_keys, observed=True)['근로자수'].sum()
+    aligned = denominators.reindex(_key_index(df_group, merge_keys))
+    return pd.Series(aligned.to_numpy(), index=df_group.index)
+
+
+# 근로자수를 붙이고 파생 지표 계산
+def add_derived_metrics(df_group, worker_cube, selections, selected_columns):
+    merge_keys = [col for col in selected_columns if col in WORKER_DIMENSIONS]
+    with trace.stage('worker_counts'):
+        근로자수 = worker_counts(df_group, worker_cube, selections, selected_columns)
+
+    with trace.stage('derive'):
+        merged = df_group[merge_keys].assign(근로자수=근로자수)
+        merged = pd.concat([merged, df_group.drop(columns=merge_keys)], axis=1)
+        merged['위험지수/근로자수'] = merged['위험지수'] / merged['근로자수']
+        merged['재해만인율'] = (merged['재해자수'] / merged['근로자수']) * 10000
+        return merged.sort_values(by='위험지수/근로자수', ascending=False)
@@ -0,0 +1,52 @@
+import json
+import os
+import re
+
+import numpy as np
+import pandas as pd
+
+# 열별 값 정리 규칙 (공백 제거 → 부분 문자열 치환 → 전체 값 별칭 순서로 적용)
+# 새 별칭은 normalization.json에만 추가하면 됨
+RULES_PATH = os.path.join(os.path.dirname(__file__), 'normalization.json')
+
+_WHITESPACE = re.compile(r'\s+')
+
+
+# 스냅샷 입력 파일 목록(loader)과 같은 파일을 읽도록 경로는 호출할 때 정함
+def load_rules(path=None):
+    with open(path or RULES_PATH, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def canonicalize(value, rule):
+    if not isinstance(value, str):
+        return value
+    if rule.get('strip_whitespace'):
+        value = _WHITESPACE.sub('', value)
+    for old, new in rule.get('replace', []):
+        value = value.replace(old, new)
+    return rule.get('aliases', {}).get(value, value)
+
+
+# 열을 한 번만 훑어 고유값으로 나누고, 고유값만 정리한 뒤 코드로 다시 펼침
+def normalize_column(series, rule):
+    codes, uniques = pd.factorize(series)
+    canonical = [canonicalize(value, rule) for value in uniques]
+    # 정리 후 같은 값이 된 고유값들은 하나의 범주로 합침
+    remap, categories = pd.factorize(pd.Index(canonical, dtype=object))
+    new_codes = np.where(codes >= 0, remap[codes], -1)
+    return pd.Categorical.from_codes(new_codes, categories=categories)
+
+
+def apply_rules(df, rules):
+    for col, rule in rules.items():
+        if col in df.columns:
+            df[col] = normalize_column(df[col], rule)
+    return df
+
+
+# 통계기준년월(YYYYMM) → 통계기준년, 고유값 단위로 계산
+def year_from_month(series):
+    codes, uniques = pd.factorize(series)
+    years = np.array([int(str(value)[:4]) for value in uniques], dtype=np.int64)
+    return pd.Series(years[codes], index=series.index)
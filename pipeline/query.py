@@ -0,0 +1,70 @@
+import os
+
+from pipeline import cache, cube, database, filters, metrics, trace
+
+# 'pandas': 메모리의 큐브로 계산 / 'sqlite': 내장 SQLite DB 파일에서 SQL로 계산
+BACKEND = os.environ.get('DASHBOARD_BACKEND', 'pandas')
+
+
+# 캐시 키: 단계 이름 + 데이터 버전 + 정규화된 선택값 + 그룹화 기준
+def cache_key(stage, dataset, selections, selected_columns):
+    return (stage, dataset.version, cache.selection_key(selections), tuple(selected_columns))
+
+
+# 결과 캐시에 없을 때만 계산하고, 계산했는지/캐시를 썼는지 단계 기록에 남김
+def _cached(result_cache, stage, key, compute):
+    computed = []
+
+    def run():
+        computed.append(True)
+        with trace.stage(stage):
+            return compute()
+
+    value = result_cache.get_or_compute(key, run)
+    if not computed:
+        trace.record(stage, 'cache')
+    return value
+
+
+# 필터 적용 (역색인으로 선택된 큐브 셀의 필요한 열만 추출)
+# sqlite 백엔드에서는 필터도 SQL에서 처리하므로 None
+def filter_cells(dataset, selections, selected_columns, result_cache):
+    if BACKEND == 'sqlite':
+        return None
+    return _cached(
+        result_cache, 'filter', cache_key('filter', dataset, selections, selected_columns),
+        lambda: filters.select_rows(dataset.cube, selections, selected_columns + cube.MEASURES, index=dataset.index),
+    )
+
+
+# 그룹화 및 정규화된 위험지수 계산
+def group_cells(dataset, filtered_df, selections, selected_columns, result_cache):
+    def compute():
+        if BACKEND == 'sqlite':
+            return database.group_cells(dataset, selections, selected_columns)
+        df_group = cube.rollup(filtered_df, selected_columns)
+        df_group['정규화된_위험지수'] = (df_group['위험지수'] / total_risk(dataset)) * 10000
+        return df_group
+
+    return _cached(result_cache, 'group', cache_key('group', dataset, selections, selected_columns), compute)
+
+
+# 근로자수 대응 및 파생 지표 계산
+# sqlite 백엔드에서는 df_group 대신 join/그룹화/파생 지표를 하나의 SQL로 계산
+def derive_metrics(dataset, df_group, selections, selected_columns, result_cache):
+    def compute():
+        if BACKEND == 'sqlite':
+            return database.derive_metrics(dataset, selections, selected_columns)
+        return metrics.add_derived_metrics(df_group, dataset.worker_cube, selections, selected_columns)
+
+    return _cached(result_cache, 'metrics', cache_key('metrics', dataset, selections, selected_columns), compute)
+
+
+# 전체 위험지수 합계
+def total_risk(dataset):
+    return dataset.cube['위험지수'].sum()
+
+
+# 1중업종, 1발생형태 당 평균 정규화된_위험지수
+def risk_average(dataset):
+    return 10000 / dataset.cube['중업종'].nunique() / dataset.cube['발생형태'].nunique()
@@ -0,0 +1,65 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+from contextlib import closing
+
+# API 응답 본문을 (엔드포인트, 파라미터) 키로 보관하는 디스크 캐시
+# 모든 세션/앱 인스턴스가 같은 파일을 공유, DASHBOARD_API_CACHE='' 이면 사용하지 않음
+CACHE_PATH = os.environ.get('DASHBOARD_API_CACHE', os.path.join('Data', '.snapshot', 'api_cache.sqlite'))
+
+Entry = namedtuple('Entry', ['body', 'etag', 'last_modified', 'fetched_at'])
+
+_lock = threading.Lock()
+_ready = set()
+
+
+def enabled(path=CACHE_PATH):
+    return bool(path)
+
+
+# 파라미터 순서와 관계없이 같은 요청이면 같은 키
+def key(endpoint, params):
+    return endpoint + '?' + json.dumps(sorted((k, str(v)) for k, v in params.items()), ensure_ascii=False)
+
+
+def _connect(path):
+    with _lock:
+        if path not in _ready:
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+            with closing(sqlite3.connect(path, timeout=30)) as conn:
+                # 읽는 쪽이 쓰는 쪽을 기다리지 않도록 WAL 모드
+                conn.execute('PRAGMA journal_mode=WAL')
+                conn.execute(
+                    'CREATE TABLE IF NOT EXISTS responses ('
+                    'key TEXT PRIMARY KEY, body TEXT, etag TEXT, last_modified TEXT, fetched_at REAL)'
+                )
+                conn.commit()
+            _ready.add(path)
+    return closing(sqlite3.connect(path, timeout=30))
+
+
+def lookup(cache_key, path=CACHE_PATH):
+    with _connect(path) as conn:
+        row = conn.execute(
+            'SELECT body, etag, last_modified, fetched_at FROM responses WHERE key = ?', (cache_key,)
+        ).fetchone()
+    return Entry(*row) if row else None
+
+
+def store(cache_key, body, etag=None, last_modified=None, path=CACHE_PATH):
+    with _connect(path) as conn:
+        conn.execute(
+            'INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?)',
+            (cache_key, body, etag, last_modified, time.time())
+        )
+        conn.commit()
+
+
+# 서버가 변경 없음(304)을 알려 준 경우 받은 시각만 갱신
+def touch(cache_key, path=CACHE_PATH):
+    with _connect(path) as conn:
+        conn.execute('UPDATE responses SET fetched_at = ? WHERE key = ?', (time.time(), cache_key))
+        conn.commit()
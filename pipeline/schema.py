@@ -0,0 +1,64 @@
+import pandas as pd
+
+# 마이크로데이터에서 읽는 열과 dtype (나머지 열은 읽지 않음)
+MICRODATA_DTYPES = {
+    '통계기준년월': 'int32',
+    '규모': 'category',
+    '대업종': 'category',
+    '중업종': 'category',
+    '발생형태': 'category',
+    '재해정도': 'category',
+}
+
+# 재해정도 → 위험지수 가중치
+severity_mapping = {
+    '사망자': 400,
+    '6개월 이상': 200.0,
+    '91~180일': 135.5,
+    '29~90일': 59.5,
+    '15~28일': 21.5,
+    '8~14일': 11,
+    '4~7일': 5.5
+}
+
+# 규모 매핑
+scale_mapping = {
+    '5인 미만': 1,
+    '5~9인': 2,
+    '10~29인': 3,
+    '30~49인': 4,
+    '50~99인': 5,
+    '100~299인': 6,
+    '300~499인': 7,
+    '500~999인': 8,
+    '1,000인 이상': 9  # Assuming 1,000 as the minimum for this range
+}
+
+# 필터/그룹화에 쓰이는 차원 열
+DIMENSION_COLUMNS = ['규모', '대업종', '중업종', '발생형태', '재해정도']
+
+
+def _vocabulary(col, values):
+    if col == '규모':
+        order = scale_mapping
+    elif col == '재해정도':
+        order = severity_mapping
+    else:
+        return sorted(values)
+    # 매핑에 없는 값은 뒤에 붙여 손실 없이 보존
+    return list(order) + sorted(v for v in values if v not in order)
+
+
+# 차원 열을 고정된 순서의 Categorical로 변환 (isin/groupby가 정수 코드로 동작)
+def to_categorical(df):
+    for col in DIMENSION_COLUMNS:
+        if col not in df.columns:
+            continue
+        if isinstance(df[col].dtype, pd.CategoricalDtype):
+            # 이미 범주형이면 범주만 재배열 (정수 코드 재매핑)
+            values = df[col].cat.categories.tolist()
+            df[col] = df[col].cat.set_categories(_vocabulary(col, values), ordered=True)
+        else:
+            values = df[col].dropna().unique().tolist()
+            df[col] = pd.Categorical(df[col], categories=_vocabulary(col, values), ordered=True)
+    return df
@@ -0,0 +1,133 @@
+import hashlib
+import json
+import os
+
+import pandas as pd
+import pyarrow as pa
+
+# 원본 파일을 매번 다시 파싱하지 않도록 정제된 데이터를 Arrow IPC 파일로 저장해 두고,
+# 원본 파일의 mtime 또는 해시가 바뀐 경우에만 다시 만든다.
+SNAPSHOT_DIR = os.path.join('Data', '.snapshot')
+
+
+def _sha256(path, chunk_size=1 << 20):
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def file_fingerprint(path, previous=None):
+    stat = os.stat(path)
+    fingerprint = {'mtime': stat.st_mtime_ns, 'size': stat.st_size}
+    # mtime과 크기가 그대로면 해시 계산 생략
+    if previous and previous.get('mtime') == fingerprint['mtime'] and previous.get('size') == fingerprint['size']:
+        fingerprint['sha256'] = previous['sha256']
+    else:
+        fingerprint['sha256'] = _sha256(path)
+    return fingerprint
+
+
+def _same_content(old, new):
+    if set(old) != set(new):
+        return False
+    return all(old[p]['sha256'] == new[p]['sha256'] for p in new)
+
+
+def _read_manifest(path):
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _dump_manifest(path, sources, version):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'version': version, 'sources': sources}, f, ensure_ascii=False, indent=2)
+
+
+# 스냅샷을 만든 원본 내용과 형식 버전으로 정해지는 데이터 버전 토큰
+def version_token(name, snapshot_dir=SNAPSHOT_DIR):
+    manifest = _read_manifest(os.path.join(snapshot_dir, f'{name}.json'))
+    if manifest is None:
+        return None
+    digests = sorted(source['sha256'] for source in manifest['sources'].values())
+    payload = json.dumps([manifest.get('version'), digests])
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+
+
+def _write_atomic(path, write):
+    # 여러 프로세스가 동시에 읽을 수 있으므로 임시 파일에 쓰고 교체
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    write(tmp_path)
+    os.replace(tmp_path, path)
+
+
+def _arrow_compatible(df):
+    # 숫자와 문자가 섞인 object 열은 Arrow 타입을 정할 수 없으므로 문자열로 통일
+    mixed = [col for col in df.columns
+             if df[col].dtype == object and pd.api.types.infer_dtype(df[col], skipna=True).startswith('mixed')]
+    if mixed:
+        df = df.assign(**{col: df[col].where(df[col].isna(), df[col].astype(str)) for col in mixed})
+    return df
+
+
+def write_snapshot(df, path):
+    table = pa.Table.from_pandas(_arrow_compatible(df), preserve_index=False)
+
+    def write(tmp_path):
+        # memory-map으로 바로 읽을 수 있도록 압축하지 않고 저장
+        with pa.OSFile(tmp_path, 'wb') as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+
+    _write_atomic(path, write)
+
+
+# zero_copy=True: 숫자/범주 열을 memory-map된 Arrow 버퍼를 그대로 가리키는 읽기 전용 배열로 반환
+# (같은 파일을 여는 모든 세션/프로세스가 OS 페이지 캐시를 공유)
+def read_snapshot(path, zero_copy=False):
+    source = pa.memory_map(path, 'r')
+    table = pa.ipc.open_file(source).read_all()
+    if zero_copy:
+        return table.to_pandas(split_blocks=True)
+    return table.to_pandas()
+
+
+# 스냅샷을 다시 만들 필요가 없는지 확인만 함 (생성은 하지 않음)
+def is_fresh(name, sources, version=1, snapshot_dir=SNAPSHOT_DIR):
+    manifest = _read_manifest(os.path.join(snapshot_dir, f'{name}.json'))
+    if not manifest or manifest.get('version') != version:
+        return False
+    if not os.path.exists(os.path.join(snapshot_dir, f'{name}.arrow')):
+        return False
+    old_sources = manifest.get('sources', {})
+    return _same_content(old_sources, {p: file_fingerprint(p, old_sources.get(p)) for p in sources})
+
+
+# version: 저장 형식(열 구성, dtype 등)이 바뀌면 올려서 기존 스냅샷을 무효화
+def load_or_build(name, sources, build, version=1, snapshot_dir=SNAPSHOT_DIR, zero_copy=False):
+    os.makedirs(snapshot_dir, exist_ok=True)
+    path = os.path.join(snapshot_dir, f'{name}.arrow')
+    manifest_path = os.path.join(snapshot_dir, f'{name}.json')
+
+    manifest = _read_manifest(manifest_path)
+    old_sources = manifest.get('sources', {}) if manifest else {}
+    sources = {p: file_fingerprint(p, old_sources.get(p)) for p in sources}
+
+    fresh = (manifest and manifest.get('version') == version
+             and os.path.exists(path) and _same_content(old_sources, sources))
+    if fresh:
+        if old_sources != sources:
+            # 내용은 같고 mtime만 바뀐 경우 manifest만 갱신
+            _write_atomic(manifest_path, lambda p: _dump_manifest(p, sources, version))
+        return read_snapshot(path, zero_copy)
+
+    df = build()
+    write_snapshot(df, path)
+    _write_atomic(manifest_path, lambda p: _dump_manifest(p, sources, version))
+    if zero_copy:
+        return read_snapshot(path, zero_copy)
+    return df
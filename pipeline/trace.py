@@ -0,0 +1,101 @@
+import json
+import logging
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+
+import numpy as np
+
+# 단계별 실행 시간/메모리 기록
+# - 실행(또는 fragment 재실행) 한 번의 단계 목록: 스레드별 보관 (Streamlit은 세션 스크립트를 스레드 하나에서 실행)
+# - p50/p95 계산용 최근 기록: 프로세스 전체(모든 세션) 공유
+# - 구조화 로그: logger 'dashboard.stages'에 단계마다 JSON 한 줄
+logger = logging.getLogger('dashboard.stages')
+
+HISTORY_SIZE = 500
+
+# DASHBOARD_STAGE_LOG=파일 경로 (또는 '-' 이면 stderr) 로 JSON 로그 출력
+_log_target = os.environ.get('DASHBOARD_STAGE_LOG')
+if _log_target and not logger.handlers:
+    _handler = logging.StreamHandler() if _log_target == '-' else logging.FileHandler(_log_target, encoding='utf-8')
+    _handler.setFormatter(logging.Formatter('%(message)s'))
+    logger.addHandler(_handler)
+    logger.setLevel(logging.INFO)
+
+_local = threading.local()
+_history_lock = threading.Lock()
+_history = defaultdict(lambda: deque(maxlen=HISTORY_SIZE))
+
+_PAGE_SIZE = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+
+
+# 현재 프로세스 RSS (MB), /proc이 없으면 None
+def rss_mb():
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE / 1024 / 1024
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def start_run():
+    _local.stages = []
+
+
+# status: 'ran' (계산함) / 'cache' (캐시된 결과 사용) / 'error' (예외 발생)
+def record(name, status='ran', seconds=0.0, memory_mb=None):
+    entry = {'stage': name, 'status': status, 'ms': round(seconds * 1000, 2),
+             'memory_mb': None if memory_mb is None else round(memory_mb, 2)}
+    stages = getattr(_local, 'stages', None)
+    if stages is not None:
+        stages.append(entry)
+    if status != 'cache':
+        with _history_lock:
+            _history[name].append(entry['ms'])
+    logger.info(json.dumps(dict(entry, ts=round(time.time(), 3), pid=os.getpid()), ensure_ascii=False))
+
+
+# 블록의 실행 시간과 RSS 변화량을 기록
+@contextmanager
+def stage(name):
+    start_rss = rss_mb()
+    start = time.perf_counter()
+    status = 'error'
+    try:
+        yield
+        status = 'ran'
+    finally:
+        end_rss = rss_mb()
+        memory_mb = None if start_rss is None or end_rss is None else end_rss - start_rss
+        record(name, status, time.perf_counter() - start, memory_mb)
+
+
+# fragment처럼 따로 다시 실행되는 영역의 단계는 별도로 모으고, 전체 실행 기록에도 이어 붙임
+@contextmanager
+def section(name):
+    parent = getattr(_local, 'stages', None)
+    _local.stages = []
+    try:
+        yield _local.stages
+    finally:
+        stages = _local.stages
+        _local.stages = parent
+        if parent is not None:
+            parent.extend(dict(entry, stage=f"{name}/{entry['stage']}") for entry in stages)
+
+
+def run_log():
+    return list(getattr(_local, 'stages', None) or [])
+
+
+# 단계별 실행 횟수와 p50/p95 (ms), 모든 세션의 최근 HISTORY_SIZE회 기준
+def percentiles():
+    with _history_lock:
+        history = {name: list(values) for name, values in _history.items()}
+    rows = []
+    for name, values in sorted(history.items()):
+        p50, p95 = np.percentile(values, [50, 95])
+        rows.append({'stage': name, 'count': len(values), 'p50_ms': round(p50, 2), 'p95_ms': round(p95, 2)})
+    return rows
@@ -1,7 +1,7 @@
 import streamlit as st
-import subprocess
-import json
 import pandas as pd
+import requests
+from pipeline import api
 
 st.title("📡 재해 정보 API 데이터 수집")
 
@@ -11,23 +11,16 @@ disaster_number = st.number_input("재해 데이터 수 (numOfRows)", min_value=
 if st.button("재해 정보 불러오기"):
     with st.spinner("재해 정보를 불러오는 중입니다..."):
         try:
-            cmd = f"""
-            curl -X 'GET' \
-            'https://apis.data.go.kr/B552468/disaster_api01/getdisaster_api?serviceKey=XtjiWbPLxexBDUbR5RjQLsQ6M77Nrjt99CAFTlyV7CzsjfImD3yIqp7E9IGa%2Br2EFc%2F0FhabrGQ4AM%2Fc5uMOWg%3D%3D&pageNo=1&numOfRows={disaster_number}' \
-            -H 'accept: */*'
-            """
-            output = subprocess.check_output(cmd, shell=True, text=True)
-            data = json.loads(output)
-            items = data['body']['items']['item']
+            items = api.disaster_items(disaster_number)
             df_disaster = pd.DataFrame(items)
 
             st.success("✅ 재해 정보 수집 성공!")
             st.dataframe(df_disaster)
 
-        except subprocess.CalledProcessError as e:
-            st.error(f"❌ 명령어 실행 실패: {e}")
-        except json.JSONDecodeError as e:
+        except requests.JSONDecodeError as e:
             st.error(f"❌ JSON 파싱 오류: {e}")
+        except requests.RequestException as e:
+            st.error(f"❌ API 요청 실패: {e}")
         except KeyError as e:
             st.error(f"❌ 응답 JSON에서 키 오류 발생: {e}")
 
@@ -40,22 +33,15 @@ news_number = st.number_input("사망 뉴스 수 (numOfRows)", min_value=1, max_
 if st.button("사망 뉴스 불러오기"):
     with st.spinner("사망 뉴스를 불러오는 중입니다..."):
         try:
-            cmd = f"""
-            curl -X 'GET' \
-            'https://apis.data.go.kr/B552468/news_api01/getNews_api01?serviceKey=XtjiWbPLxexBDUbR5RjQLsQ6M77Nrjt99CAFTlyV7CzsjfImD3yIqp7E9IGa%2Br2EFc%2F0FhabrGQ4AM%2Fc5uMOWg%3D%3D&pageNo=1&numOfRows={news_number}' \
-            -H 'accept: */*'
-            """
-            output2 = subprocess.check_output(cmd, shell=True, text=True)
-            data2 = json.loads(output2)
-            items2 = data2['body']['items']['item']
+            items2 = api.news_items(news_number)
             df_news = pd.DataFrame(items2)
 
             st.success("✅ 사망 뉴스 수집 성공!")
             st.dataframe(df_news)
 
-        except subprocess.CalledProcessError as e:
-            st.error(f"❌ 명령어 실행 실패: {e}")
-        except json.JSONDecodeError as e:
+        except requests.JSONDecodeError as e:
             st.error(f"❌ JSON 파싱 오류: {e}")
+        except requests.RequestException as e:
+            st.error(f"❌ API 요청 실패: {e}")
         except KeyError as e:
             st.error(f"❌ 응답 JSON에서 키 오류 발생: {e}")
@@ -1,8 +1,8 @@
 import streamlit as st
 import pandas as pd
-import subprocess
-import json
+import requests
 import google.generativeai as genai
+from pipeline import api
 
 # 페이지 설정
 st.set_page_config(page_title="재해정보 + Gemini 분석", layout="wide")
@@ -24,47 +24,36 @@ if user_api_key:
     if st.button("📥 재해 정보 불러오기"):
         with st.spinner("재해 정보를 불러오는 중입니다..."):
             try:
-                SERVICE_KEY = "XtjiWbPLxexBDUbR5RjQLsQ6M77Nrjt99CAFTlyV7CzsjfImD3yIqp7E9IGa%2Br2EFc%2F0FhabrGQ4AM%2Fc5uMOWg%3D%3D"
-                cmd = f"""
-                curl -X 'GET' \
-                'https://apis.data.go.kr/B552468/disaster_api01/getdisaster_api?serviceKey={SERVICE_KEY}&pageNo=1&numOfRows={disaster_number}' \
-                -H 'accept: */*'
-                """
-                output = subprocess.check_output(cmd, shell=True, text=True)
-
-                try:
-                    data = json.loads(output)
-                    items = data['body']['items']['item']
-                    df_disaster = pd.DataFrame(items)
-
-                    st.success("✅ 재해 정보 수집 성공!")
-                    st.dataframe(df_disaster)
+                items = api.disaster_items(disaster_number)
+                df_disaster = pd.DataFrame(items)
 
-                    # 3️⃣ Gemini 분석 프롬프트 생성
-                    preview = df_disaster.to_csv(index=False)
-                    prompt = f"""
-                    아래는 산업재해 API에서 가져온 일부 재해 정보입니다. 이 데이터를 보고 주요 특징이나 인사이트를 요약해주세요. 
-                    (예: 빈도 높은 사고 유형, 특정 업종, 경향 등)
+                st.success("✅ 재해 정보 수집 성공!")
+                st.dataframe(df_disaster)
 
-                    ```
-                    {preview}
-                    ```
-                    """
+                # 3️⃣ Gemini 분석 프롬프트 생성
+                preview = df_disaster.to_csv(index=False)
+                prompt = f"""
+                아래는 산업재해 API에서 가져온 일부 재해 정보입니다. 이 데이터를 보고 주요 특징이나 인사이트를 요약해주세요. 
+                (예: 빈도 높은 사고 유형, 특정 업종, 경향 등)
 
-                    model = genai.GenerativeModel("gemini-2.0-flash")
-                    with st.spinner("Gemini가 데이터를 분석 중입니다..."):
-                        response = model.generate_content(prompt)
-                        st.subheader("Gemini 분석 결과")
-                        st.markdown(response.text)
-
-                except json.JSONDecodeError:
-                    st.error("❌ JSON 파싱 오류! 응답 내용을 확인하세요.")
-                    st.code(output)
-                except KeyError as e:
-                    st.error(f"❌ 응답 JSON에서 키 오류 발생: {e}")
+                ```
+                {preview}
+                ```
+                """
 
-            except subprocess.CalledProcessError as e:
-                st.error(f"❌ 명령어 실행 실패: {e}")
+                model = genai.GenerativeModel("gemini-2.0-flash")
+                with st.spinner("Gemini가 데이터를 분석 중입니다..."):
+                    response = model.generate_content(prompt)
+                    st.subheader("Gemini 분석 결과")
+                    st.markdown(response.text)
+
+            except requests.JSONDecodeError as e:
+                st.error("❌ JSON 파싱 오류! 응답 내용을 확인하세요.")
+                st.code(e.doc)
+            except KeyError as e:
+                st.error(f"❌ 응답 JSON에서 키 오류 발생: {e}")
+            except requests.RequestException as e:
+                st.error(f"❌ API 요청 실패: {e}")
 
 else:
     st.warning("👈 좌측 사이드바에 Gemini API 키를 입력해주세요.")
@@ -1,8 +1,8 @@
 import streamlit as st
 import pandas as pd
-import subprocess
-import json
+import requests
 import google.generativeai as genai
+from pipeline import api
 
 # 사이드바에 Gemini API 키 입력 받기
 st.sidebar.header("🔐 Gemini API 설정")
@@ -53,47 +53,36 @@ if user_api_key:
     if st.button("📡 링크 수집 및 분석"):
         with st.spinner("링크를 불러오는 중입니다..."):
             try:
-                SERVICE_KEY = "XtjiWbPLxexBDUbR5RjQLsQ6M77Nrjt99CAFTlyV7CzsjfImD3yIqp7E9IGa%2Br2EFc%2F0FhabrGQ4AM%2Fc5uMOWg%3D%3D"
-                cmd = f"""
-                curl -X 'GET' \
-                'https://apis.data.go.kr/B552468/selectMediaList/getselectMediaList?serviceKey={SERVICE_KEY}&ctgr03={ctgr03}&pageNo=1&numOfRows={number}' \
-                -H 'accept: */*'
-                """
-                output = subprocess.check_output(cmd, shell=True, text=True)
-
-                try:
-                    data = json.loads(output)
-                    items = data['body']['items']['item']
-                    df_news = pd.DataFrame(items)
+                items = api.media_items(ctgr03, number)
+                df_news = pd.DataFrame(items)
 
-                    st.success("링크수집 성공!")
-                    st.dataframe(df_news)
+                st.success("링크수집 성공!")
+                st.dataframe(df_news)
 
-                    # Gemini 프롬프트 생성
-                    preview = df_news.head(5).to_csv(index=False)
-                    prompt = f"""
-                    아래는 '{selected_type}' 사고유형에 해당하는 산업재해 링크 리스트입니다.
-                    이 리스트 내에서 숙박업종에 적용될만 한 자료를 찾아서 그 링크를 최대 3개 제시하고 요약해 주세요.
+                # Gemini 프롬프트 생성
+                preview = df_news.head(5).to_csv(index=False)
+                prompt = f"""
+                아래는 '{selected_type}' 사고유형에 해당하는 산업재해 링크 리스트입니다.
+                이 리스트 내에서 숙박업종에 적용될만 한 자료를 찾아서 그 링크를 최대 3개 제시하고 요약해 주세요.
 
-                    ```
-                    {preview}
-                    ```
-                    """
-
-                    model = genai.GenerativeModel("gemini-2.0-flash")
-                    with st.spinner("Gemini가 분석 중입니다..."):
-                        response = model.generate_content(prompt)
-                        st.subheader("📑 Gemini 요약 결과")
-                        st.markdown(response.text)
+                ```
+                {preview}
+                ```
+                """
 
-                except json.JSONDecodeError:
-                    st.error("❌ JSON 파싱 오류. 응답 내용을 확인하세요.")
-                    st.code(output)
-                except KeyError as e:
-                    st.error(f"❌ JSON 키 오류: {e}")
+                model = genai.GenerativeModel("gemini-2.0-flash")
+                with st.spinner("Gemini가 분석 중입니다..."):
+                    response = model.generate_content(prompt)
+                    st.subheader("📑 Gemini 요약 결과")
+                    st.markdown(response.text)
 
-            except subprocess.CalledProcessError as e:
-                st.error(f"❌ 명령 실행 실패: {e}")
+            except requests.JSONDecodeError as e:
+                st.error("❌ JSON 파싱 오류. 응답 내용을 확인하세요.")
+                st.code(e.doc)
+            except KeyError as e:
+                st.error(f"❌ JSON 키 오류: {e}")
+            except requests.RequestException as e:
+                st.error(f"❌ API 요청 실패: {e}")
 
 else:
     st.warning("👈 Gemini API 키를 좌측에 입력하세요.")
@@ -0,0 +1,60 @@
+import importlib
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from stub_server import StubServer  # noqa: E402
+
+
+@pytest.fixture
+def stub():
+    server = StubServer()
+    yield server
+    server.close()
+
+
+# DASHBOARD_API_BASE_URL을 스텁 서버로 지정하고 api 모듈을 다시 읽음 (세션/설정 초기화)
+# 응답 캐시는 끔
+@pytest.fixture
+def api(stub, monkeypatch):
+    monkeypatch.setenv('DASHBOARD_API_BASE_URL', stub.base_url)
+    monkeypatch.setenv('DASHBOARD_API_CACHE', '')
+    from pipeline import api, response_cache
+    importlib.reload(response_cache)
+    module = importlib.reload(api)
+    monkeypatch.setattr(module, 'RETRIES', 1)
+    yield module
+    # 환경 변수를 되돌린 뒤 다시 읽어 다른 테스트에 스텁 설정이 남지 않게 함
+    monkeypatch.undo()
+    importlib.reload(response_cache)
+    importlib.reload(api)
+
+
+# 응답 캐시를 임시 파일로 켠 api 모듈
+@pytest.fixture
+def api_with_cache(stub, monkeypatch, tmp_path):
+    monkeypatch.setenv('DASHBOARD_API_BASE_URL', stub.base_url)
+    monkeypatch.setenv('DASHBOARD_API_CACHE', str(tmp_path / 'api_cache.sqlite'))
+    from pipeline import api, response_cache
+    importlib.reload(response_cache)
+    module = importlib.reload(api)
+    monkeypatch.setattr(module, 'RETRIES', 0)
+    yield module
+    monkeypatch.undo()
+    importlib.reload(response_cache)
+    importlib.reload(api)
+
+
+# DASHBOARD_DATABASE를 임시 파일로 지정하고 database 모듈을 다시 읽음
+@pytest.fixture
+def database(monkeypatch, tmp_path):
+    monkeypatch.setenv('DASHBOARD_DATABASE', str(tmp_path / 'dashboard.sqlite'))
+    from pipeline import database
+    module = importlib.reload(database)
+    yield module
+    monkeypatch.undo()
+    importlib.reload(database)
@@ -0,0 +1,52 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+# 공공데이터포털 API 흉내를 내는 로컬 서버
+# handler(path, query, headers) → (상태 코드, 헤더 dict, 본문 bytes) 를 테스트마다 바꿔 끼움
+class StubServer:
+    def __init__(self):
+        self.requests = []
+        self.client_ports = set()
+        self.handler = lambda path, query, headers: (200, {}, json_body([]))
+        self._lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            # keep-alive 확인을 위해 HTTP/1.1 + Content-Length 로 응답
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                query = {k: v[0] for k, v in parse_qs(url.query).items()}
+                with stub._lock:
+                    stub.requests.append((url.path, query, dict(self.headers)))
+                    stub.client_ports.add(self.client_address[1])
+                status, headers, body = stub.handler(url.path, query, self.headers)
+                try:
+                    self.send_response(status)
+                    for name, value in headers.items():
+                        self.send_header(name, value)
+                    self.send_header('Content-Length', str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                except (BrokenPipeError, ConnectionResetError):
+                    # 제한 시간 테스트에서 클라이언트가 먼저 끊은 경우
+                    pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.base_url = f'http://127.0.0.1:{self.server.server_address[1]}'
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def json_body(items):
+    return json.dumps({'header': {'resultCode': '00'}, 'body': {'items': {'item': items}}}).encode('utf-8')
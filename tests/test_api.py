@@ -0,0 +1,225 @@
+import socket
+import threading
+from urllib.parse import unquote
+
+import pytest
+import requests
+
+from stub_server import json_body
+
+
+def test_service_key_reaches_server_unchanged(api, stub):
+    api.get(api.NEWS, pageNo=1, numOfRows=3)
+    path, query, headers = stub.requests[0]
+    assert path.endswith('/' + api.NEWS)
+    # 포털 키는 URL 인코딩된 형태로 발급되므로, 서버가 디코딩한 값이 원래 키와 같아야 함
+    assert query['serviceKey'] == unquote(
+        'XtjiWbPLxexBDUbR5RjQLsQ6M77Nrjt99CAFTlyV7CzsjfImD3yIqp7E9IGa%2Br2EFc%2F0FhabrGQ4AM%2Fc5uMOWg%3D%3D'
+    )
+    assert query['numOfRows'] == '3'
+
+
+def test_connection_is_reused(api, stub):
+    for _ in range(10):
+        api.get(api.MEDIA_LIST, ctgr03='11000001', pageNo=1, numOfRows=1)
+    assert len(stub.requests) == 10
+    assert len(stub.client_ports) == 1
+
+
+def test_503_is_retried(api, stub):
+    responses = iter([(503, {}, b'busy'), (200, {}, json_body([{'n': 1}]))])
+    stub.handler = lambda path, query, headers: next(responses)
+    response = api.get(api.DISASTER, pageNo=1, numOfRows=1)
+    assert response.json()['body']['items']['item'] == [{'n': 1}]
+    assert len(stub.requests) == 2
+
+
+def test_error_status_raises_after_retries(api, stub):
+    stub.handler = lambda path, query, headers: (503, {}, b'busy')
+    with pytest.raises(requests.RequestException):
+        api.get(api.NEWS, pageNo=1, numOfRows=1)
+    assert len(stub.requests) == api.RETRIES + 1
+
+
+def test_read_timeout_raises(api, stub, monkeypatch):
+    release = threading.Event()
+
+    def slow(path, query, headers):
+        release.wait(2)
+        return 200, {}, json_body([])
+
+    stub.handler = slow
+    monkeypatch.setattr(api, 'TIMEOUT', (1, 0.2))
+    monkeypatch.setattr(api, 'RETRIES', 0)
+    try:
+        with pytest.raises(requests.RequestException):
+            api.get(api.NEWS, pageNo=1, numOfRows=1)
+    finally:
+        release.set()
+
+
+def test_refused_connection_raises(api, monkeypatch):
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        port = sock.getsockname()[1]
+    monkeypatch.setattr(api, 'BASE_URL', f'http://127.0.0.1:{port}')
+    monkeypatch.setattr(api, 'RETRIES', 0)
+    with pytest.raises(requests.ConnectionError):
+        api.get(api.NEWS, pageNo=1, numOfRows=1)
+
+
+def test_non_json_body_raises_json_error(api, stub):
+    stub.handler = lambda path, query, headers: (200, {}, b'<OpenAPI_ServiceResponse>ERROR</OpenAPI_ServiceResponse>')
+    with pytest.raises(requests.JSONDecodeError) as error:
+        api.get(api.NEWS, pageNo=1, numOfRows=1).json()
+    assert error.value.doc.startswith('<OpenAPI_ServiceResponse>')
+
+
+# TOTAL건을 가진 스텁: pageNo/numOfRows로 잘라 응답, fail_pages의 페이지는 지정한 횟수만큼 JSON이 아닌 오류 응답
+def paged_handler(total, fail_pages=None):
+    fail_pages = dict(fail_pages or {})
+    lock = threading.Lock()
+
+    def handler(path, query, headers):
+        page, size = int(query['pageNo']), int(query['numOfRows'])
+        with lock:
+            if fail_pages.get(page, 0) > 0:
+                fail_pages[page] -= 1
+                return 200, {}, b'<OpenAPI_ServiceResponse>LIMITED</OpenAPI_ServiceResponse>'
+        rows = [{'n': n} for n in range((page - 1) * size, min(page * size, total))]
+        if not rows:
+            return 200, {}, b'{"body": {"items": ""}}'
+        return 200, {}, json_body(rows)
+    return handler
+
+
+def test_fetch_items_splits_into_pages(api, stub):
+    stub.handler = paged_handler(2300)
+    items = api.fetch_items(api.NEWS, 1200, page_size=500)
+    assert [item['n'] for item in items] == list(range(1200))
+    pages = sorted((int(q['pageNo']), int(q['numOfRows'])) for _, q, _ in stub.requests)
+    assert pages == [(1, 500), (2, 500), (3, 500)]
+
+
+def test_fetch_items_small_request_is_one_page(api, stub):
+    stub.handler = paged_handler(2300)
+    assert len(api.fetch_items(api.NEWS, 100, page_size=500)) == 100
+    assert [(q['pageNo'], q['numOfRows']) for _, q, _ in stub.requests] == [('1', '100')]
+
+
+def test_fetch_items_stops_at_end_of_data(api, stub):
+    stub.handler = paged_handler(700)
+    items = api.fetch_items(api.DISASTER, 2000, page_size=500)
+    assert [item['n'] for item in items] == list(range(700))
+
+
+def test_fetch_items_wraps_single_item(api, stub):
+    stub.handler = lambda path, query, headers: (200, {}, b'{"body": {"items": {"item": {"n": 0}}}}')
+    assert api.fetch_items(api.NEWS, 1) == [{'n': 0}]
+
+
+def test_fetch_items_resumes_only_failed_pages(api, stub):
+    stub.handler = paged_handler(1500, fail_pages={2: 1})
+    items = api.fetch_items(api.NEWS, 1500, page_size=500)
+    assert [item['n'] for item in items] == list(range(1500))
+    requested = sorted(int(q['pageNo']) for _, q, _ in stub.requests)
+    assert requested == [1, 2, 2, 3]
+
+
+def test_fetch_items_gives_up_after_page_attempts(api, stub):
+    stub.handler = paged_handler(1500, fail_pages={2: 100})
+    with pytest.raises(requests.JSONDecodeError):
+        api.fetch_items(api.NEWS, 1500, page_size=500)
+    assert sum(q['pageNo'] == '2' for _, q, _ in stub.requests) == api.PAGE_ATTEMPTS
+
+
+def _etag_handler(state):
+    # If-None-Match가 현재 ETag와 같으면 304, 아니면 본문 + ETag
+    def handler(path, query, headers):
+        if state.get('down'):
+            return 503, {}, b'busy'
+        if headers.get('If-None-Match') == state['etag']:
+            return 304, {'ETag': state['etag']}, b''
+        return 200, {'ETag': state['etag']}, json_body(state['rows'])
+    return handler
+
+
+def test_cache_serves_within_ttl_without_request(api_with_cache, stub):
+    api = api_with_cache
+    stub.handler = _etag_handler({'etag': '"v1"', 'rows': [{'n': 1}]})
+    assert api.news_items(1) == [{'n': 1}]
+    assert api.news_items(1) == [{'n': 1}]
+    assert len(stub.requests) == 1
+
+
+def test_cache_key_ignores_parameter_order(api_with_cache, stub):
+    api = api_with_cache
+    stub.handler = _etag_handler({'etag': '"v1"', 'rows': [{'n': 1}]})
+    api.get_json(api.MEDIA_LIST, ctgr03='11000001', pageNo=1, numOfRows=1)
+    api.get_json(api.MEDIA_LIST, numOfRows=1, pageNo=1, ctgr03='11000001')
+    assert len(stub.requests) == 1
+
+
+def test_expired_entry_is_revalidated_with_etag(api_with_cache, stub, monkeypatch):
+    api = api_with_cache
+    state = {'etag': '"v1"', 'rows': [{'n': 1}]}
+    stub.handler = _etag_handler(state)
+    api.news_items(1)
+    monkeypatch.setitem(api.CACHE_TTL, api.NEWS, 0)
+
+    # 변경 없음: 304 → 저장된 응답
+    assert api.news_items(1) == [{'n': 1}]
+    assert stub.requests[-1][2].get('If-None-Match') == '"v1"'
+
+    # 변경됨: 새 본문을 받아 저장
+    state.update(etag='"v2"', rows=[{'n': 2}])
+    assert api.news_items(1) == [{'n': 2}]
+    assert len(stub.requests) == 3
+
+
+def test_304_refreshes_fetch_time(api_with_cache, stub, monkeypatch):
+    api = api_with_cache
+    stub.handler = _etag_handler({'etag': '"v1"', 'rows': [{'n': 1}]})
+    api.news_items(1)
+    cache_key = api.response_cache.key(api.NEWS, {'pageNo': 1, 'numOfRows': 1})
+    before = api.response_cache.lookup(cache_key).fetched_at
+    monkeypatch.setitem(api.CACHE_TTL, api.NEWS, 0)
+    api.news_items(1)
+    assert api.response_cache.lookup(cache_key).fetched_at > before
+
+
+def test_stale_entry_is_served_when_upstream_fails(api_with_cache, stub, monkeypatch):
+    api = api_with_cache
+    state = {'etag': '"v1"', 'rows': [{'n': 1}]}
+    stub.handler = _etag_handler(state)
+    api.news_items(1)
+    monkeypatch.setitem(api.CACHE_TTL, api.NEWS, 0)
+    state['down'] = True
+    assert api.news_items(1) == [{'n': 1}]
+
+
+def test_failure_without_cache_entry_raises(api_with_cache, stub):
+    api = api_with_cache
+    stub.handler = _etag_handler({'etag': '"v1"', 'rows': [], 'down': True})
+    with pytest.raises(requests.RequestException):
+        api.news_items(1)
+
+
+def test_fresh_ignores_ttl_and_does_not_serve_stale(api_with_cache, stub):
+    api = api_with_cache
+    state = {'etag': '"v1"', 'rows': [{'n': 1}]}
+    stub.handler = _etag_handler(state)
+    api.media_items('11000001', 1)
+    assert api.media_items('11000001', 1, fresh=True) == [{'n': 1}]
+    assert len(stub.requests) == 2
+    state['down'] = True
+    with pytest.raises(requests.RequestException):
+        api.media_items('11000001', 1, fresh=True)
+
+
+def test_error_bodies_are_not_cached(api_with_cache, stub):
+    api = api_with_cache
+    stub.handler = lambda path, query, headers: (200, {}, b'{"header": {"resultCode": "30"}}')
+    with pytest.raises(KeyError):
+        api.news_items(1)
+    assert api.response_cache.lookup(api.response_cache.key(api.NEWS, {'pageNo': 1, 'numOfRows': 1})) is None
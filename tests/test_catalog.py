@@ -0,0 +1,94 @@
+import json
+import os
+import shutil
+from urllib.parse import parse_qs, urlparse
+
+import pandas as pd
+import pytest
+
+from stub_server import json_body
+
+from pipeline import catalog
+
+SOURCE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '발생형태')
+
+
+# 기존 목록 파일의 행을 API item 형태로 되돌림 (링크의 medSeq/codeCd/codeSeq를 item 필드로)
+def items_from_file(name):
+    rows = pd.read_csv(os.path.join(SOURCE_DIR, f'{name}.csv'), encoding='utf-8-sig')
+    items = []
+    for row in rows.itertuples(index=False):
+        query = {k: v[0] for k, v in parse_qs(urlparse(row.링크).query).items()}
+        items.append({'title': row.제목, 'regDate': str(row.날짜), 'medSeq': query['medSeq'],
+                      'codeCd': query['codeCd'], 'codeSeq': query['codeSeq'], 'filepath': '/upload/x.pdf'})
+    return items
+
+
+def test_to_catalog_rebuilds_existing_rows():
+    expected = pd.read_csv(os.path.join(SOURCE_DIR, '떨어짐.csv'), encoding='utf-8-sig')
+    df = catalog.to_catalog(items_from_file('떨어짐'))
+    assert list(df.columns) == catalog.COLUMNS
+    assert df.astype(str).equals(expected.astype(str))
+
+
+def test_to_catalog_normalizes_dates():
+    item = {'title': 't', 'regDate': '2024-12-30 10:00', 'medSeq': '1', 'codeCd': 'N000001', 'codeSeq': '1100000'}
+    assert catalog.to_catalog([item])['날짜'].tolist() == ['20241230']
+
+
+@pytest.mark.parametrize('items', [
+    # 상세 페이지 주소를 만들 필드가 없음 (다른 링크 필드로 대신하지 않음)
+    [{'title': 't', 'regDate': '20240101', 'filepath': '/upload/x.pdf'}],
+    [{'subject': 't', 'medSeq': '1', 'codeCd': 'N000001', 'codeSeq': '1100000'}],
+    [],
+])
+def test_to_catalog_rejects_incomplete_items(items):
+    with pytest.raises(ValueError):
+        catalog.to_catalog(items)
+
+
+@pytest.fixture
+def folder(tmp_path):
+    shutil.copytree(SOURCE_DIR, tmp_path, dirs_exist_ok=True)
+    return str(tmp_path)
+
+
+def _read_bytes(folder):
+    return {name: open(os.path.join(folder, name), 'rb').read() for name in os.listdir(folder) if name.endswith('.csv')}
+
+
+def test_refresh_keeps_files_when_fields_are_unknown(api, stub, folder):
+    stub.handler = lambda path, query, headers: (200, {}, json_body([{'medName': 't', 'filepath': '/x.pdf'}]))
+    before = _read_bytes(folder)
+    manifest = catalog.refresh(folder, num_rows=10)
+    assert _read_bytes(folder) == before
+    assert all(entry['error'] for entry in manifest['categories'].values())
+    with open(os.path.join(folder, catalog.MANIFEST), encoding='utf-8') as f:
+        assert json.load(f)['refreshed_at'] == manifest['refreshed_at']
+
+
+def test_refresh_writes_only_changed_lists(api, stub, folder):
+    fall = items_from_file('떨어짐')
+    codes = {code: name for name, code in catalog.CATEGORIES.items()}
+
+    def handler(path, query, headers):
+        name = codes[query['ctgr03']]
+        if name == '떨어짐':
+            return 200, {}, json_body(fall)
+        if name == '넘어짐':
+            return 200, {}, json_body([dict(fall[0], title='새 자료', medSeq='99999')] + fall[:-1])
+        return 503, {}, b'busy'
+
+    stub.handler = handler
+    before = _read_bytes(folder)
+    manifest = catalog.refresh(folder, num_rows=100)
+    after = _read_bytes(folder)
+
+    entries = manifest['categories']
+    assert after['떨어짐.csv'] == before['떨어짐.csv']
+    assert entries['떨어짐']['added'] == 0 and entries['떨어짐']['error'] is None
+    assert 'changed_at' not in entries['떨어짐']
+    assert after['넘어짐.csv'] != before['넘어짐.csv']
+    assert entries['넘어짐']['changed_at'] == manifest['refreshed_at']
+    # 실패한 유형은 기존 파일 유지
+    assert after['감전.csv'] == before['감전.csv'] and entries['감전']['error']
@@ -0,0 +1,34 @@
+import numpy as np
+import pandas as pd
+
+from pipeline import charts
+
+
+def chart_data(x_axis, x_values, n_rows=180):
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({
+        x_axis: np.resize(x_values, n_rows),
+        '발생형태': [f'유형{i}' for i in range(n_rows)],
+        '위험지수': rng.random(n_rows),
+        '재해자수': rng.integers(1, 9, n_rows),
+    })
+
+
+# 통계기준년 x축: '기타' 막대도 범주로 그려지도록 x값을 문자열로 통일하고 범주형 축으로 정렬
+def test_other_bucket_on_year_axis():
+    df = chart_data('통계기준년', [2021, 2022, 2023])
+    chart_df = charts.reduce_chart_data(df, '위험지수', '통계기준년', '발생형태')
+    assert set(chart_df['통계기준년'].map(type)) == {str}
+    assert chart_df['통계기준년'].str.startswith(charts.OTHER_LABEL).sum() == len(df) - charts.CHART_TOP_N
+
+    fig = charts.subplot_figure(chart_df, ['위험지수'], '통계기준년', '발생형태')
+    assert fig.layout.xaxis.type == 'category'
+    assert fig.layout.xaxis.categoryorder == 'category ascending'
+
+
+# 문자열 x축은 plotly 기본값(등장 순서)을 그대로 사용
+def test_text_axis_keeps_appearance_order():
+    df = chart_data('규모', ['5~9인', '5인 미만'])
+    chart_df = charts.reduce_chart_data(df, '위험지수', '규모', '발생형태')
+    fig = charts.subplot_figure(chart_df, ['위험지수'], '규모', '발생형태')
+    assert fig.layout.xaxis.type is None
@@ -0,0 +1,218 @@
+import json
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks import pipeline_benchmark as bench
+from pipeline import cache, cube, filters, loader, normalize, query, schema
+
+ROWS = 3000
+YEARS = [2021, 2022, 2023]
+SELECTIONS = 40
+
+
+# 합성 연도 파일 (규모/중업종 일부를 비워 NaN 차원도 포함)
+def write_year(folder, vocabulary, year, n_rows=ROWS, extension='csv'):
+    rng = np.random.default_rng(year)
+    df = bench.synthetic_year(*vocabulary, year, n_rows, rng)
+    df.loc[rng.random(n_rows) < 0.02, '규모'] = None
+    df.loc[rng.random(n_rows) < 0.02, '중업종'] = None
+    path = os.path.join(folder, f'{year}_산업재해통계_마이크로데이터_merged.{extension}')
+    if extension == 'xlsx':
+        df.to_excel(path, index=False)
+    else:
+        df.to_csv(path, index=False)
+    return path
+
+
+def make_folder(folder, vocabulary, years):
+    os.makedirs(folder, exist_ok=True)
+    for name in [bench.RATE_FILE, '중업종리스트.csv']:
+        shutil.copy(os.path.join(bench.ROOT, 'Data', name), folder)
+    for year in years:
+        write_year(folder, vocabulary, year)
+    return folder
+
+
+# 범주 순서/행 순서와 관계없이 비교하도록 범주형 열을 값으로 바꾸고 정렬
+def canonical(df, by):
+    df = df.astype({col: object for col in df.columns if isinstance(df[col].dtype, pd.CategoricalDtype)})
+    return df.sort_values(by=by, kind='stable').reset_index(drop=True)
+
+
+def assert_same(left, right, by):
+    pd.testing.assert_frame_equal(canonical(left, by), canonical(right, by), check_dtype=False)
+
+
+# 열마다 선택 안 함 / 일부 / 전체 중 하나 (근로자수 기준 열은 하나 이상 선택)
+def random_selections(dataset, rng):
+    while True:
+        selections = {}
+        for col in filters.FILTER_COLUMNS:
+            values = dataset.cube[col].dropna().unique().tolist()
+            mode = rng.integers(3)
+            if mode == 0:
+                selections[col] = []
+            elif mode == 1:
+                selections[col] = list(rng.choice(values, size=rng.integers(1, min(len(values), 5) + 1), replace=False))
+            else:
+                selections[col] = values
+        if any(selections[col] for col in filters.FILTER_COLUMNS if col != '발생형태'):
+            return selections
+
+
+def run_query(dataset, selections):
+    selected_columns = filters.multiselect_columns(selections)
+    result_cache = cache.LRUCache(maxsize=8)
+    filtered_df = query.filter_cells(dataset, selections, selected_columns, result_cache)
+    df_group = query.group_cells(dataset, filtered_df, selections, selected_columns, result_cache)
+    return df_group, query.derive_metrics(dataset, df_group, selections, selected_columns, result_cache)
+
+
+# 큐브/근로자수 큐브 이전의 원본 행 groupby + merge 계산
+def baseline_metrics(raw, df_rate_melted, selections, selected_columns):
+    filtered_df = raw
+    for col, values in selections.items():
+        if values:
+            filtered_df = filtered_df[filtered_df[col].isin(values)]
+    df_group = filtered_df.groupby(selected_columns).agg(
+        위험지수=('재해정도_숫자', 'sum'),
+        재해자수=('재해정도_숫자', 'count')
+    ).reset_index()
+    df_group['정규화된_위험지수'] = (df_group['위험지수'] / raw['재해정도_숫자'].sum()) * 10000
+
+    merge_keys = [col for col in selected_columns if col != '발생형태']
+    filtered_keys_df = filtered_df[merge_keys].drop_duplicates()
+    filtered_rate_df = pd.merge(df_rate_melted, filtered_keys_df, on=merge_keys, how='inner')
+    grouped = filtered_rate_df.groupby(merge_keys).sum(numeric_only=True).reset_index()[merge_keys + ['근로자수']]
+    merged = grouped.merge(df_group, on=merge_keys, how='outer')
+    merged['위험지수/근로자수'] = merged['위험지수'] / merged['근로자수']
+    merged['재해만인율'] = (merged['재해자수'] / merged['근로자수']) * 10000
+    return merged
+
+
+@pytest.fixture(scope='module')
+def vocabulary():
+    return bench.read_vocabulary(os.path.join(bench.ROOT, 'Data'))
+
+
+@pytest.fixture(scope='module')
+def data_folder(vocabulary, tmp_path_factory):
+    return make_folder(str(tmp_path_factory.mktemp('data')), vocabulary, YEARS)
+
+
+@pytest.fixture(scope='module')
+def dataset(data_folder):
+    return loader.load_dataset(data_folder)
+
+
+@pytest.fixture
+def pandas_backend(monkeypatch):
+    monkeypatch.setattr(query, 'BACKEND', 'pandas')
+
+
+def test_metrics_match_baseline_merge(data_folder, dataset, pandas_backend):
+    objects = {col: object for col in cube.CUBE_DIMENSIONS if col != '통계기준년'}
+    raw = pd.concat([loader.read_year(path) for path in loader.microdata_files(data_folder)], ignore_index=True)
+    raw = raw.astype(objects)
+    df_rate_melted = loader.read_worker_counts(data_folder).astype({col: object for col in ['규모', '대업종', '중업종']})
+
+    rng = np.random.default_rng(0)
+    for _ in range(SELECTIONS):
+        selections = random_selections(dataset, rng)
+        selected_columns = filters.multiselect_columns(selections)
+        _, merged = run_query(dataset, selections)
+        expected = baseline_metrics(raw, df_rate_melted, selections, selected_columns)
+        assert_same(merged[list(expected.columns)], expected, selected_columns)
+
+
+def test_sqlite_matches_pandas(dataset, database, monkeypatch):
+    rng = np.random.default_rng(1)
+    for _ in range(SELECTIONS):
+        selections = random_selections(dataset, rng)
+        selected_columns = filters.multiselect_columns(selections)
+        monkeypatch.setattr(query, 'BACKEND', 'pandas')
+        pandas_group, pandas_merged = run_query(dataset, selections)
+        monkeypatch.setattr(query, 'BACKEND', 'sqlite')
+        sqlite_group, sqlite_merged = run_query(dataset, selections)
+        assert_same(sqlite_group, pandas_group, selected_columns)
+        assert_same(sqlite_merged, pandas_merged, selected_columns)
+
+
+@pytest.mark.parametrize('load_mode', ['memory', 'shared'])
+def test_append_matches_cold_load(vocabulary, tmp_path, monkeypatch, load_mode):
+    monkeypatch.setattr(loader, 'LOAD_MODE', load_mode)
+    folder = make_folder(str(tmp_path / 'append'), vocabulary, YEARS[:-1])
+    dataset = loader.load_dataset(folder)
+    write_year(folder, vocabulary, YEARS[-1])
+    appended = loader.append_new_years(dataset, folder)
+
+    cold_folder = str(tmp_path / 'cold')
+    shutil.copytree(folder, cold_folder, ignore=shutil.ignore_patterns('.snapshot'))
+    cold = loader.load_dataset(cold_folder)
+
+    assert appended.years == cold.years == tuple(YEARS)
+    assert appended.version != dataset.version
+    assert_same(appended.cube, cold.cube, cube.CUBE_DIMENSIONS)
+    rng = np.random.default_rng(2)
+    for _ in range(SELECTIONS):
+        selections = random_selections(cold, rng)
+        assert_same(
+            filters.select_rows(appended.cube, selections, index=appended.index),
+            filters.select_rows(cold.cube, selections, index=cold.index),
+            cube.CUBE_DIMENSIONS,
+        )
+
+
+@pytest.mark.parametrize('extension', ['csv', 'xlsx'])
+def test_stream_matches_full_build(vocabulary, tmp_path, extension):
+    path = write_year(str(tmp_path), vocabulary, YEARS[0], n_rows=2000, extension=extension)
+    full = cube.build_cube(schema.to_categorical(loader.read_year(path)))
+    assert_same(loader.stream_year_cube(path, chunksize=700), full, cube.CUBE_DIMENSIONS)
+
+
+# 규칙 파일에 별칭만 추가해도 스냅샷과 데이터 버전이 바뀜
+# (연도 하나만 쓰므로 프로세스 풀 없이 이 프로세스에서 바꾼 RULES_PATH로 다시 만듦)
+def test_rules_edit_rebuilds_snapshots(vocabulary, tmp_path, monkeypatch):
+    rules_path = str(tmp_path / 'normalization.json')
+    shutil.copy(normalize.RULES_PATH, rules_path)
+    monkeypatch.setattr(normalize, 'RULES_PATH', rules_path)
+    folder = make_folder(str(tmp_path / 'data'), vocabulary, YEARS[:1])
+    dataset = loader.load_dataset(folder)
+    assert '5~9인' in set(dataset.cube['규모'].dropna())
+
+    rules = normalize.load_rules()
+    rules['microdata']['규모']['aliases'] = {'5~9인': '5~9인 사업장'}
+    with open(rules_path, 'w', encoding='utf-8') as f:
+        json.dump(rules, f, ensure_ascii=False)
+    reloaded = loader.load_dataset(folder)
+
+    scales = set(reloaded.cube['규모'].dropna())
+    assert '5~9인' not in scales and '5~9인 사업장' in scales
+    assert reloaded.version != dataset.version
+
+
+# 근로자수 통계 파일만 바뀌어도 데이터 버전이 바뀌어 SQLite DB 파일을 다시 만듦
+def test_worker_counts_edit_rebuilds_database(vocabulary, tmp_path, database, monkeypatch):
+    monkeypatch.setattr(query, 'BACKEND', 'sqlite')
+    folder = make_folder(str(tmp_path / 'data'), vocabulary, YEARS[:1])
+    selections = {col: [] for col in filters.FILTER_COLUMNS}
+    selections['통계기준년'] = [YEARS[0]]
+    dataset = loader.load_dataset(folder)
+    _, before = run_query(dataset, selections)
+
+    rate_path = os.path.join(folder, loader.WORKER_COUNTS_FILE)
+    rate = pd.read_csv(rate_path)
+    rate['5인 미만'] = pd.to_numeric(rate['5인 미만'], errors='coerce') * 2
+    rate.to_csv(rate_path, index=False)
+    reloaded = loader.load_dataset(folder)
+    _, after = run_query(reloaded, selections)
+
+    assert reloaded.version != dataset.version
+    assert after['근로자수'].iloc[0] > before['근로자수'].iloc[0]
+    monkeypatch.setattr(query, 'BACKEND', 'pandas')
+    _, expected = run_query(reloaded, selections)
+    assert after['근로자수'].iloc[0] == expected['근로자수'].iloc[0]